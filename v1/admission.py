@@ -0,0 +1,83 @@
+import time
+
+
+class BucketTable:
+    """같은 한도를 쓰는 토큰 버킷 묶음. 키마다 [토큰, 갱신 시각]만 저장하고 오래 안 쓴 키는 정리."""
+
+    __slots__ = ("rate", "capacity", "idle_ttl", "_buckets")
+
+    def __init__(self, rate: float, capacity: float, idle_ttl: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.idle_ttl = idle_ttl
+        self._buckets: dict[object, list[float]] = {}
+
+    def available(self, key, now: float) -> bool:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return self.capacity >= 1
+        return min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate) >= 1
+
+    def take(self, key, now: float):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [self.capacity - 1, now]
+            return
+        bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate) - 1
+        bucket[1] = now
+
+    def sweep(self, now: float) -> int:
+        # 🔸 가득 찰 만큼 쉬었고 idle_ttl도 지난 버킷은 없는 것과 같으므로 삭제
+        refill_time = self.capacity / self.rate if self.rate else float("inf")
+        ttl = max(self.idle_ttl, refill_time)
+        stale = [key for key, (_, updated) in self._buckets.items() if now - updated >= ttl]
+        for key in stale:
+            del self._buckets[key]
+        return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class AdmissionController:
+    """LLM 경로 앞단의 사용자 / 채널 / 전역 토큰 버킷."""
+
+    def __init__(
+        self,
+        user_rate: float, user_burst: float,
+        channel_rate: float, channel_burst: float,
+        global_rate: float, global_burst: float,
+        idle_ttl: float = 600.0,
+        sweep_interval: float = 60.0,
+        clock=time.monotonic,
+    ):
+        self.clock = clock
+        self.sweep_interval = sweep_interval
+        self._tables = {
+            "user": BucketTable(user_rate, user_burst, idle_ttl),
+            "channel": BucketTable(channel_rate, channel_burst, idle_ttl),
+            "global": BucketTable(global_rate, global_burst, idle_ttl),
+        }
+        self._last_sweep = clock()
+        self.stats = {"admitted": 0, "rejected_user": 0, "rejected_channel": 0, "rejected_global": 0, "evicted": 0}
+
+    def reject_reason(self, user_id, channel_id) -> str | None:
+        """허용되면 None(토큰 사용), 막히면 걸린 한도 이름("user" / "channel" / "global")."""
+        now = self.clock()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self.stats["evicted"] += sum(table.sweep(now) for table in self._tables.values())
+
+        keys = {"user": user_id, "channel": channel_id, "global": None}
+        # 🔹 세 한도를 모두 확인한 뒤에만 토큰을 씀 (한쪽에서 막히면 다른 쪽 토큰은 그대로)
+        for scope, table in self._tables.items():
+            if not table.available(keys[scope], now):
+                self.stats[f"rejected_{scope}"] += 1
+                return scope
+        for scope, table in self._tables.items():
+            table.take(keys[scope], now)
+        self.stats["admitted"] += 1
+        return None
+
+    def snapshot(self) -> dict:
+        return dict(self.stats, users=len(self._tables["user"]), channels=len(self._tables["channel"]))
@@ -0,0 +1,122 @@
+import hashlib, json, os, sqlite3, time
+from collections import OrderedDict
+
+
+def faq_fingerprint(faq: dict) -> str:
+    # 🔹 FAQ 내용이 바뀌면 해시도 바뀌어서 이전 답변이 자동으로 무효화됨
+    payload = json.dumps(faq, ensure_ascii=False, sort_keys=True, default=dict)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_question(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class AnswerCache:
+    """LLM 폴백 답변 캐시. 메모리 LRU + TTL, 선택적으로 SQLite에 보관해서 재시작 후에도 유지."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600 * 6, db_path: str | None = None, clock=time.time,
+                 max_rows: int = 10000, purge_every: int = 100):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.max_rows = max_rows
+        self.purge_every = max(1, purge_every)
+        self._puts_since_purge = 0
+        self.faq_hash = ""
+        self._entries: OrderedDict[tuple[str, str], tuple[str, float]] = OrderedDict()
+        self._db = None
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0, "expired": 0, "evictions": 0, "stores": 0, "purged": 0}
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " faq_hash TEXT NOT NULL, question TEXT NOT NULL, answer TEXT NOT NULL,"
+                " created_at REAL NOT NULL, PRIMARY KEY (faq_hash, question))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_answers_created ON answers (created_at)")
+            self._db.commit()
+
+    def bind(self, faq: dict):
+        # 🔸 FAQ가 바뀌었으면 이전 버전 답변은 메모리/디스크에서 모두 제거
+        new_hash = faq_fingerprint(faq)
+        if new_hash == self.faq_hash:
+            return
+        self.faq_hash = new_hash
+        self._entries.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM answers WHERE faq_hash != ? OR created_at < ?", (new_hash, self.clock() - self.ttl))
+            self._db.commit()
+
+    def get(self, question: str) -> str | None:
+        key = (self.faq_hash, normalize_question(question))
+        now = self.clock()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            answer, created_at = entry
+            if now - created_at <= self.ttl:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return answer
+            del self._entries[key]
+            self.stats["expired"] += 1
+
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT answer, created_at FROM answers WHERE faq_hash = ? AND question = ?", key
+            ).fetchone()
+            if row is not None and now - row[1] <= self.ttl:
+                self._remember(key, row[0], row[1])
+                self.stats["hits"] += 1
+                self.stats["disk_hits"] += 1
+                return row[0]
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, question: str, answer: str):
+        key = (self.faq_hash, normalize_question(question))
+        now = self.clock()
+        self._remember(key, answer, now)
+        self.stats["stores"] += 1
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)", (*key, answer, now))
+            self._db.commit()
+            # 🔸 오래 켜 두어도 디스크가 계속 커지지 않도록 purge_every번 저장마다 정리
+            self._puts_since_purge += 1
+            if self._puts_since_purge >= self.purge_every:
+                self.purge()
+
+    def purge(self) -> int:
+        """만료된 행과 max_rows를 넘는 오래된 행을 디스크에서 지움. 지운 행 수를 돌려줌."""
+        self._puts_since_purge = 0
+        if self._db is None:
+            return 0
+        deleted = self._db.execute("DELETE FROM answers WHERE created_at < ?", (self.clock() - self.ttl,)).rowcount
+        deleted += self._db.execute(
+            "DELETE FROM answers WHERE rowid IN (SELECT rowid FROM answers ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        ).rowcount
+        self._db.commit()
+        self.stats["purged"] += deleted
+        return deleted
+
+    def _remember(self, key: tuple[str, str], answer: str, created_at: float):
+        self._entries[key] = (answer, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
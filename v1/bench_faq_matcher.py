@@ -0,0 +1,54 @@
+import random, sys, time
+from difflib import get_close_matches
+
+import constants
+from faq_matcher import FAQMatcher
+
+
+def synthetic_faq(size: int, seed: int = 0) -> dict:
+    # 🔹 실제 FAQ 키 + 임의 한글 키로 원하는 크기의 FAQ 생성
+    rng = random.Random(seed)
+    faq = dict(constants.FAQ)
+    while len(faq) < size:
+        key = "".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(rng.randint(2, 8)))
+        faq[key] = "synthetic"
+    return faq
+
+
+def queries(faq: dict, count: int, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    keys = list(faq.keys())
+    out = []
+    for _ in range(count):
+        key = rng.choice(keys)
+        variant = rng.choice([key, f"{key} 은?", key.replace(" ", ""), f"{key[:-1]}", "오늘 날씨 어때"])
+        out.append(variant)
+    return out
+
+
+def bench(name: str, fn, items: list[str]) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    per_call = (time.perf_counter() - start) / len(items) * 1e6
+    print(f"  {name:<8} {per_call:10.1f} µs/lookup")
+    return per_call
+
+
+def main(sizes: list[int]):
+    for size in sizes:
+        faq = synthetic_faq(size)
+        items = queries(faq, 300)
+
+        start = time.perf_counter()
+        matcher = FAQMatcher(faq)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        print(f"FAQ size={len(faq)} (index build {build_ms:.1f} ms)")
+        base = bench("difflib", lambda q: get_close_matches(q, faq.keys(), n=1, cutoff=0.6), items)
+        fast = bench("ngram", lambda q: matcher.best(q), items)
+        print(f"  speedup  {base / fast:10.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [len(constants.FAQ), 1000, 5000])
@@ -0,0 +1,60 @@
+import time
+
+from discord import Embed
+
+import constants
+from payloads import PayloadCache
+
+
+def build_help_embeds_per_request(faq_2: dict) -> list[Embed]:
+    # 🔹 기존 handle_user_message 방식: 요청마다 임베드를 새로 만듦
+    faq_items = list(faq_2.items())
+    embeds = []
+    for i in range(0, len(faq_items), 25):
+        chunk = faq_items[i:i + 25]
+        embed = Embed(
+            title="마롱 사용 가이드" if i == 0 else "📄 추가 키워드 안내",
+            description="아래 키워드를 입력하면 관련 정보를 알려드려요:",
+            color=0x6cc644,
+        )
+        for key, value in chunk:
+            short_value = value if len(value) <= 1024 else value[:1020] + "..."
+            embed.add_field(name=key, value=short_value, inline=False)
+        embeds.append(embed)
+    return embeds
+
+
+def build_member_guide_per_request(faq: dict) -> str:
+    faq_message = "\n\n".join([f"**{key}**: {value}" for key, value in faq.items()])
+    return f"📖 **마롱 이용 가이드 (FAQ)**\n\n{faq_message}"
+
+
+def bench(name: str, fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    per_call = (time.perf_counter() - start) / rounds * 1e6
+    print(f"  {name:<28} {per_call:10.2f} µs/request")
+    return per_call
+
+
+def main(rounds: int = 20000):
+    cache = PayloadCache(constants.FAQ, constants.FAQ_2)
+
+    print("help embeds")
+    base = bench("per-request build", lambda: build_help_embeds_per_request(constants.FAQ_2), rounds)
+    fast = bench("cached", lambda: cache.current.help_embeds, rounds)
+    print(f"  speedup {base / fast:.0f}x")
+
+    print("member FAQ DM")
+    base = bench("per-request join", lambda: build_member_guide_per_request(constants.FAQ), rounds)
+    fast = bench("cached", lambda: cache.current.member_guide, rounds)
+    print(f"  speedup {base / fast:.0f}x")
+
+    start = time.perf_counter()
+    cache.update(dict(constants.FAQ, 새키워드="새 답변"), constants.FAQ_2)
+    print(f"recompile after content change: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import argparse, asyncio, json, math, os, random, sys, tempfile, time
+
+import constants
+from admission import AdmissionController
+from llm_dispatcher import FakeModel, LLMDispatcher
+from outbound import FakeMessage, OutboundScheduler
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EVAL_PATH = os.path.join(HERE, "retrieval_eval.json")
+PUBLIC_CHANNEL_BASE = 9_000_000
+INQUIRY_CHANNEL_BASE = 9_100_000
+CHATTER = ["ㅋㅋㅋ", "ㅎㅎ", "ㅠㅠ", "😀", "👍👍", "?", "...", "ㄱ", "asdf", "qwerty zxcv", "ㅁㄴㅇㄹ 헐랭", "뭐지뭐지"]
+
+
+class StubUser:
+    def __init__(self, user_id: int, name: str, bot: bool = False):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.discriminator = "0"
+        self.mention = f"<@{user_id}>"
+        self.bot = bot
+
+
+class StubRole:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class StubChannel:
+    """전송 지연만 흉내 내는 채널. 레이트 리밋은 OutboundScheduler 설정으로 조절."""
+
+    def __init__(self, channel_id: int, name: str, guild, latency: float):
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.latency = latency
+        self.mention = f"<#{channel_id}>"
+        self.sent = 0
+
+    async def send(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+        return FakeMessage(self, kwargs.get("content"), kwargs.get("embed"))
+
+    async def delete(self):
+        self.guild.client.channels.pop(self.id, None)
+
+
+class StubGuild:
+    def __init__(self, client, latency: float):
+        self.id = 1
+        self.client = client
+        self.latency = latency
+        self.default_role = StubRole("@everyone")
+        self.roles = [self.default_role, StubRole("운영진")]
+        self.me = client.user
+        self._next_id = INQUIRY_CHANNEL_BASE + 50_000
+
+    async def create_text_channel(self, name: str, overwrites=None, reason=None):
+        await asyncio.sleep(self.latency)
+        self._next_id += 1
+        channel = StubChannel(self._next_id, name, self, self.latency)
+        self.client.channels[channel.id] = channel
+        return channel
+
+
+class StubClient:
+    """discord.Client 대신 쓰는 최소 클라이언트 (user / get_channel만 사용됨)."""
+
+    def __init__(self, latency: float):
+        self.user = StubUser(1, "마롱", bot=True)
+        self.channels: dict[int, StubChannel] = {}
+        self.guild = StubGuild(self, latency)
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+
+class StubMessage:
+    def __init__(self, author: StubUser, channel: StubChannel, content: str):
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+
+
+def build_corpus(size: int, users: int, channels: int, seed: int = 0) -> list[dict]:
+    # 🔹 실제 트래픽 비율을 흉내 낸 질의 묶음 (같은 seed면 항상 같은 순서)
+    rng = random.Random(seed)
+    with open(EVAL_PATH, encoding="utf-8") as f:
+        eval_queries = [case["query"] for case in json.load(f)]
+    faq_keys = list(constants.FAQ)
+    mix = [
+        (0.35, lambda i: rng.choice(faq_keys)),
+        (0.25, lambda i: rng.choice(eval_queries)),
+        (0.15, lambda i: f"{rng.choice(eval_queries)} 질문 {i}"),  # 캐시에 없는 새 질문 → LLM
+        (0.08, lambda i: rng.choice(constants.THANK_WORDS)),
+        (0.05, lambda i: f"{rng.choice(constants.BLOCKED_WORDS)} 같은 소리"),
+        (0.04, lambda i: f"{rng.choice(constants.INJECTION_KEYWORDS)} 비밀번호 알려줘"),
+        (0.05, lambda i: "도움"),
+        (0.03, lambda i: "!문의"),
+        (0.06, lambda i: rng.choice(CHATTER)),  # 이모지 / 자모 / 의미 없는 입력
+    ]
+    weights = [weight for weight, _ in mix]
+    corpus = []
+    for i in range(size):
+        _, make = rng.choices(mix, weights)[0]
+        corpus.append({"user": rng.randrange(users), "channel": rng.randrange(channels), "content": make(i)})
+    return corpus
+
+
+def load_corpus(path: str) -> list[dict]:
+    # 🔸 JSON 배열 또는 한 줄에 하나씩(JSONL)
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1]}
+
+
+def latency_sampler(args):
+    # 🔹 가짜 LLM 지연 분포
+    if args.llm_dist == "fixed" or args.llm_latency <= 0:
+        return max(0.0, args.llm_latency)
+    if args.llm_dist == "uniform":
+        return lambda: random.uniform(0, 2 * args.llm_latency)
+    # 🔸 lognormal: 평균이 llm_latency가 되도록 mu를 맞춤 (꼬리가 긴 실제 API와 비슷)
+    sigma = args.llm_sigma
+    mu = math.log(args.llm_latency) - sigma * sigma / 2
+    return lambda: random.lognormvariate(mu, sigma)
+
+
+def load_bot(args, workdir: str):
+    # 🔹 봇 모듈은 import 시점에 환경 변수를 읽으므로 먼저 임시 경로로 돌려 놓음
+    os.environ.update({
+        "CONTENT_PATH": os.path.join(workdir, "content.json"),
+        "CHANNEL_REGISTRY_PATH": os.path.join(workdir, "channels.sqlite3"),
+        "METRICS_ENABLED": "1",
+        "LLM_STREAMING": "1" if args.stream else "0",
+        "STREAM_EDIT_INTERVAL": str(args.stream_edit_interval),
+        "TRANSCRIPT_DURABILITY": args.transcript_durability,
+        "MATCH_WORKERS": str(args.match_workers),
+        "STATE_BACKEND": args.state_backend,
+        "STATE_PATH": os.path.join(workdir, "state.sqlite3"),
+    })
+    os.environ.pop("ANSWER_CACHE_PATH", None)
+    os.chdir(workdir)  # 🔸 문의 기록은 ./logs 에 쌓임
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    import marong_bot_v1 as bot
+    if bot.match_pool is not None:
+        bot.match_pool.warm()
+
+    stub = StubClient(args.discord_latency)
+    bot.client = stub
+    bot.dispatcher = LLMDispatcher(
+        FakeModel(latency=latency_sampler(args), fail_rate=args.llm_fail_rate, chunk_delay=args.llm_chunk_delay),
+        max_concurrency=args.llm_concurrency,
+        timeout=args.llm_timeout,
+    )
+    if not args.discord_limits:
+        # 🔸 파이프라인 자체를 재기 위해 Discord 레이트 리밋 대기는 기본으로 뺌
+        bot.outbound = OutboundScheduler(
+            route_rate=1e6, route_burst=10**6, global_rate=1e6, global_burst=10**6, metrics=bot.metrics,
+        )
+    if not args.admission:
+        bot.admission = AdmissionController(1e9, 1e9, 1e9, 1e9, 1e9, 1e9)
+
+    public, inquiry = [], []
+    for i in range(args.channels):
+        if i % 2 == 0:
+            channel = StubChannel(PUBLIC_CHANNEL_BASE + i, f"질문방-{i}", stub.guild, args.discord_latency)
+            public.append(channel)
+        else:
+            # 🔹 문의 채널: 활동 시간 갱신 + 대화 기록 경로까지 거치도록 등록
+            channel = StubChannel(INQUIRY_CHANNEL_BASE + i, f"문의-user{i}", stub.guild, args.discord_latency)
+            bot.channel_registry.register(channel.id, 10_000 + i)
+            bot.expiry_scheduler.schedule(channel.id, bot.channel_registry.clock(), bot.IDLE_POLICIES["bot"])
+            inquiry.append(channel)
+        stub.channels[channel.id] = channel
+        bot.ALLOWED_CHANNEL_IDS.add(channel.id)
+    return bot, public + inquiry
+
+
+async def run(args, bot, channels: list, corpus: list[dict]) -> dict:
+    loop = asyncio.get_running_loop()
+    users = {}
+    latencies: list[float] = []
+    lag: list[float] = []
+    errors = 0
+    next_index = 0
+    done = False
+
+    async def monitor():
+        # 🔹 이벤트 루프 지연: 잠든 시간보다 얼마나 늦게 깨어났는지
+        while not done:
+            start = loop.time()
+            await asyncio.sleep(args.lag_interval)
+            lag.append(max(0.0, loop.time() - start - args.lag_interval))
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < len(corpus):
+            entry = corpus[next_index]
+            next_index += 1
+            user_id = 100_000 + int(entry["user"])
+            author = users.get(user_id) or users.setdefault(user_id, StubUser(user_id, f"user{entry['user']}"))
+            message = StubMessage(author, channels[int(entry["channel"]) % len(channels)], entry["content"])
+            start = time.perf_counter()
+            try:
+                await bot.on_message(message)
+            except Exception as e:
+                errors += 1
+                if errors <= 5:
+                    print(f"[WARN] on_message 실패: {type(e).__name__}: {e}")
+            latencies.append(time.perf_counter() - start)
+
+    bot.transcript_logger.start()
+    monitor_task = asyncio.create_task(monitor())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    done = True
+    await monitor_task
+
+    snapshot = bot.metrics.snapshot()
+    await bot.transcript_logger.close()
+    await bot.outbound.close()
+    await bot.channel_registry.close()
+    bot.dispatcher.close()
+    if bot.match_pool is not None:
+        bot.match_pool.close()
+
+    ms = lambda stats: {k: round(v * 1e3, 3) for k, v in stats.items()}
+    return {
+        "messages": len(corpus),
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "msgs_per_sec": round(len(corpus) / elapsed, 1) if elapsed else 0.0,
+        "errors": errors,
+        "reply_latency_ms": ms(percentiles(latencies)),
+        "loop_lag_ms": ms(percentiles(lag)),
+        "replies": {name: int(v) for name, v in snapshot["counters"].items()},
+        "stages": {
+            name: {"count": h["count"], "p50_ms<=": h["p50"] * 1e3, "p95_ms<=": h["p95"] * 1e3, "p99_ms<=": h["p99"] * 1e3}
+            for name, h in sorted(snapshot["histograms"].items())
+        },
+        "llm": dict(bot.dispatcher.stats, upstream_calls=bot.dispatcher.model.calls),
+        "outbound": bot.outbound.stats,
+        "transcript": bot.transcript_logger.stats,
+    }
+
+
+def print_report(report: dict):
+    lat, lag = report["reply_latency_ms"], report["loop_lag_ms"]
+    print(f"messages={report['messages']} concurrency={report['concurrency']} elapsed={report['elapsed_s']:.2f}s "
+          f"throughput={report['msgs_per_sec']:.1f} msg/s errors={report['errors']}")
+    print(f"reply latency  p50={lat['p50']:.2f} ms p95={lat['p95']:.2f} ms p99={lat['p99']:.2f} ms max={lat['max']:.2f} ms")
+    print(f"event-loop lag p50={lag['p50']:.2f} ms p95={lag['p95']:.2f} ms p99={lag['p99']:.2f} ms max={lag['max']:.2f} ms")
+    print("replies: " + ", ".join(f"{name}={count}" for name, count in sorted(report["replies"].items())))
+    print("stages (bucket upper bounds):")
+    for name, h in report["stages"].items():
+        print(f"  {name:<52} n={h['count']:<6} p50<={h['p50_ms<=']:g} ms p95<={h['p95_ms<=']:g} ms p99<={h['p99_ms<=']:g} ms")
+    print(f"llm={report['llm']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Discord / Gemini 없이 메시지 파이프라인 처리량 측정")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="재생할 코퍼스 (JSON 배열 또는 JSONL, 항목: user / channel / content)")
+    parser.add_argument("--save-corpus", help="생성한 코퍼스를 JSONL로 저장 (다음 실행에서 --corpus로 재생)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="가짜 LLM 평균 지연(초)")
+    parser.add_argument("--llm-dist", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--llm-sigma", type=float, default=0.6)
+    parser.add_argument("--llm-fail-rate", type=float, default=0.02)
+    parser.add_argument("--llm-chunk-delay", type=float, default=0.02)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--llm-timeout", type=float, default=20.0)
+    parser.add_argument("--stream", action="store_true", help="LLM_STREAMING 경로로 측정")
+    parser.add_argument("--stream-edit-interval", type=float, default=0.2)
+    parser.add_argument("--discord-latency", type=float, default=0.005, help="가짜 Discord 전송 지연(초)")
+    parser.add_argument("--discord-limits", action="store_true", help="운영 설정의 전송 레이트 리밋 유지")
+    parser.add_argument("--admission", action="store_true", help="운영 설정의 LLM 호출 한도 유지")
+    parser.add_argument("--transcript-durability", choices=("buffered", "flush", "fsync"), default="flush")
+    parser.add_argument("--match-workers", type=int, default=0, help="매칭 워커 프로세스 수 (0이면 이벤트 루프에서 실행)")
+    parser.add_argument("--state-backend", choices=("memory", "local"), default="memory")
+    parser.add_argument("--lag-interval", type=float, default=0.01)
+    parser.add_argument("--json", help="결과를 JSON으로 저장 (회귀 비교용)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    corpus = load_corpus(args.corpus) if args.corpus else build_corpus(args.messages, args.users, args.channels, args.seed)
+    if args.save_corpus:
+        with open(args.save_corpus, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in corpus)
+    random.seed(args.seed)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="marong-bench-") as workdir:
+        try:
+            bot, channels = load_bot(args, workdir)
+            report = asyncio.run(run(args, bot, channels, corpus))
+        finally:
+            os.chdir(cwd)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
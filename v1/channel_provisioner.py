@@ -0,0 +1,217 @@
+import asyncio, time
+from collections import deque
+
+SPARE_KIND = "spare"
+
+
+def guild_id_of(guild) -> int | None:
+    return getattr(guild, "id", None)
+
+
+class ChannelProvisioner:
+    """문의 채널 생성 창구. 같은 사용자 / 종류의 동시 요청은 하나로 합치고, 미리 만들어 둔 숨김 채널이 있으면 넘겨줌."""
+
+    def __init__(
+        self,
+        registry,
+        get_channel,
+        create,
+        claim=None,
+        create_spare=None,
+        spare_guild=None,
+        pool_size: int = 0,
+        max_concurrent_creates: int = 2,
+        refill_interval: float = 2.0,
+        error_backoff: float = 60.0,
+    ):
+        self.registry = registry
+        self.get_channel = get_channel  # (channel_id) -> 채널 또는 None
+        self.create = create  # async (guild, owner, kind) -> 새 채널
+        self.claim = claim  # async (spare, guild, owner, kind) -> None (이름 / 권한 변경)
+        self.create_spare = create_spare  # async (guild) -> 숨김 채널
+        self.spare_guild = spare_guild or (lambda: None)  # () -> 예비 채널을 만들어 둘 길드
+        self.pool_size = pool_size if claim and create_spare else 0
+        self.refill_interval = refill_interval
+        self.error_backoff = error_backoff
+        self._inflight: dict[tuple[int, str, int | None], asyncio.Future] = {}
+        # 🔸 예비 채널은 길드별로 보관 (다른 길드의 채널을 넘겨주지 않도록)
+        self._pools: dict[int | None, deque] = {}
+        self._spare_ids: set[int] = set()
+        # 🔹 생성 API 호출은 요청 / 예비 채널 보충을 합쳐 동시에 max_concurrent_creates개까지만
+        self._create_slots = asyncio.Semaphore(max(1, max_concurrent_creates))
+        self._refill_wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.stats = {"requests": 0, "coalesced": 0, "existing": 0, "from_pool": 0, "created": 0, "spares_created": 0, "claim_failures": 0, "errors": 0}
+
+    @property
+    def spares(self) -> int:
+        return len(self._spare_ids)
+
+    def spares_in(self, guild) -> int:
+        return len(self._pools.get(guild_id_of(guild), ()))
+
+    def existing(self, owner_id: int, kind: str = "bot", guild_id: int | None = None):
+        channel_id = self.registry.channel_of(owner_id, kind, guild_id)
+        return self.get_channel(channel_id) if channel_id else None
+
+    def add_spare(self, channel):
+        # 🔸 재시작 / 재연결 후 저장돼 있던 예비 채널 복원용. 이미 있는 채널은 다시 넣지 않음
+        if channel.id in self._spare_ids:
+            return
+        self._spare_ids.add(channel.id)
+        guild_id = guild_id_of(getattr(channel, "guild", None))
+        self._pools.setdefault(guild_id, deque()).append(channel)
+        self.registry.register(channel.id, channel.id, SPARE_KIND, guild_id)
+
+    async def provision(self, guild, owner, kind: str = "bot"):
+        """(채널, 새로 만들었는지). 이미 있거나 같은 요청이 진행 중이면 그 채널을 돌려줌."""
+        self.stats["requests"] += 1
+        key = (owner.id, kind, guild_id_of(guild))
+
+        # 🔸 확인 → 등록까지 await 없이 처리해서 더블클릭 / 재시도가 끼어들 틈이 없음
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future), False
+        channel = self.existing(owner.id, kind, key[2])
+        if channel is not None:
+            self.stats["existing"] += 1
+            return channel, False
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            channel = await self._acquire(guild, owner, kind)
+            self.registry.register(channel.id, owner.id, kind, key[2])
+            future.set_result(channel)
+            return channel, True
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            future.set_exception(e)
+            future.exception()  # 🔸 기다리는 쪽이 없어도 경고가 나지 않도록
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _acquire(self, guild, owner, kind: str):
+        # 🔹 예비 채널이 있으면 이름 / 권한만 바꿔서 바로 넘겨줌 (API 호출 1번)
+        pool = self._pools.get(guild_id_of(guild))
+        while pool:
+            spare = pool.popleft()
+            self._spare_ids.discard(spare.id)
+            self._refill_wake.set()
+            try:
+                await self.claim(spare, guild, owner, kind)
+            except Exception as e:
+                print(f"[WARN] 예비 문의 채널 전환 실패 ({spare.id}): {e}")
+                self.stats["claim_failures"] += 1
+                await self._discard_spare(spare)
+                continue
+            self.registry.unregister(spare.id)
+            self.stats["from_pool"] += 1
+            return spare
+
+        async with self._create_slots:
+            channel = await self.create(guild, owner, kind)
+        self.stats["created"] += 1
+        return channel
+
+    async def _discard_spare(self, spare):
+        # 🔸 전환에 실패한 예비 채널은 지움. 지우지도 못하면 예비 채널 기록을 남겨 재시작 때 다시 복원
+        try:
+            await spare.delete()
+        except Exception as e:
+            print(f"[WARN] 예비 문의 채널 삭제 실패 ({spare.id}), 다음 시작 때 다시 확인: {e}")
+            return
+        self.registry.unregister(spare.id)
+
+    async def _run(self):
+        while True:
+            self._refill_wake.clear()
+            while (guild := self.spare_guild()) is not None and self.spares_in(guild) < self.pool_size:
+                try:
+                    async with self._create_slots:
+                        channel = await self.create_spare(guild)
+                except Exception as e:
+                    print(f"[ERROR] 예비 문의 채널 생성 실패: {e}")
+                    await asyncio.sleep(self.error_backoff)
+                    continue
+                self.add_spare(channel)
+                self.stats["spares_created"] += 1
+                # 🔸 몰릴 때도 보충은 천천히 (생성 API 호출 수를 제한)
+                await asyncio.sleep(self.refill_interval)
+            await self._refill_wake.wait()
+
+    def start(self):
+        if self.pool_size and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+if __name__ == "__main__":
+    # 🔹 같은 사용자의 동시 요청 5개 + 여러 사용자 몰림에서 생성 호출 수 확인
+    from channel_registry import ChannelRegistry
+
+    class _Channel:
+        def __init__(self, channel_id: int, name: str, guild=None):
+            self.id = channel_id
+            self.name = name
+            self.guild = guild
+
+    class _Guild:
+        id = 1
+
+    class _User:
+        def __init__(self, user_id: int):
+            self.id = user_id
+
+    async def _demo():
+        channels: dict[int, _Channel] = {}
+        calls = {"create": 0, "claim": 0}
+
+        async def create(guild, owner, kind):
+            calls["create"] += 1
+            await asyncio.sleep(0.2)
+            channel = _Channel(1000 + len(channels), f"문의-{owner.id}", guild)
+            channels[channel.id] = channel
+            return channel
+
+        async def create_spare(guild):
+            return await create(guild, _User(0), SPARE_KIND)
+
+        async def claim(spare, guild, owner, kind):
+            calls["claim"] += 1
+            await asyncio.sleep(0.01)
+            spare.name = f"문의-{owner.id}"
+
+        registry = ChannelRegistry(db_path=None)
+        guild = _Guild()
+        provisioner = ChannelProvisioner(registry, channels.get, create, claim, create_spare, lambda: guild,
+                                         pool_size=3, refill_interval=0.0)
+        provisioner.start()
+        while provisioner.spares < 3:
+            await asyncio.sleep(0.05)
+        calls["create"] = 0
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(provisioner.provision(guild, _User(1)) for _ in range(5)))
+        print(f"double-click x5: distinct channels={len({c.id for c, _ in results})} "
+              f"created flags={[created for _, created in results]} {time.perf_counter() - start:.3f}s")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(provisioner.provision(guild, _User(user_id)) for user_id in range(2, 12)))
+        print(f"burst of 10 users: {time.perf_counter() - start:.2f}s calls={calls} stats={provisioner.stats}")
+        await provisioner.close()
+
+    asyncio.run(_demo())
@@ -0,0 +1,170 @@
+import asyncio, os, sqlite3, time
+
+
+class ChannelRecord:
+    __slots__ = ("channel_id", "owner_id", "kind", "last_active", "guild_id")
+
+    def __init__(self, channel_id: int, owner_id: int, kind: str, last_active: float, guild_id: int | None = None):
+        self.channel_id = channel_id
+        self.owner_id = owner_id
+        self.kind = kind
+        self.last_active = last_active
+        self.guild_id = guild_id
+
+    @property
+    def owner_key(self) -> tuple[int, str, int | None]:
+        return self.owner_id, self.kind, self.guild_id
+
+
+class ChannelRegistry:
+    """문의 채널 ↔ 주인 매핑과 마지막 활동 시각. SQLite에 저장해서 재시작 후에도 유지."""
+
+    def __init__(self, db_path: str | None = "./data/channels.sqlite3", flush_interval: float = 30.0, clock=time.time):
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._by_channel: dict[int, ChannelRecord] = {}
+        # 🔹 (주인, 종류, 길드) -> 채널. 같은 사용자라도 길드마다 따로 문의 채널을 가짐
+        self._by_owner: dict[tuple[int, str, int | None], int] = {}
+        self._dirty: set[int] = set()
+        self._task: asyncio.Task | None = None
+        self._db = None
+        self.stats = {"touches": 0, "flushes": 0, "rows_flushed": 0}
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 🔸 샤드 프로세스들이 같은 파일을 함께 씀 (WAL)
+            self._db = sqlite3.connect(db_path, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS inquiry_channels ("
+                " channel_id INTEGER PRIMARY KEY, owner_id INTEGER NOT NULL,"
+                " kind TEXT NOT NULL, last_active REAL NOT NULL, guild_id INTEGER)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(inquiry_channels)")}
+            if "guild_id" not in columns:
+                self._db.execute("ALTER TABLE inquiry_channels ADD COLUMN guild_id INTEGER")
+            self._db.execute("DROP INDEX IF EXISTS idx_owner_kind")
+            self._db.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_owner_kind_guild ON inquiry_channels (owner_id, kind, guild_id)"
+            )
+            self._db.commit()
+
+    def load(self) -> int:
+        # 🔹 저장된 채널 목록 복원
+        if self._db is None:
+            return 0
+        rows = self._db.execute("SELECT channel_id, owner_id, kind, last_active, guild_id FROM inquiry_channels")
+        for row in rows:
+            self._remember(ChannelRecord(*row))
+        return len(self._by_channel)
+
+    def _remember(self, record: ChannelRecord):
+        self._by_channel[record.channel_id] = record
+        self._by_owner[record.owner_key] = record.channel_id
+
+    def register(self, channel_id: int, owner_id: int, kind: str = "bot", guild_id: int | None = None):
+        previous = self._by_owner.get((owner_id, kind, guild_id))
+        if previous is not None and previous != channel_id:
+            self.unregister(previous)
+        record = ChannelRecord(channel_id, owner_id, kind, self.clock(), guild_id)
+        self._remember(record)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO inquiry_channels (channel_id, owner_id, kind, last_active, guild_id)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (channel_id, owner_id, kind, record.last_active, guild_id),
+            )
+            self._db.commit()
+
+    def unregister(self, channel_id: int) -> ChannelRecord | None:
+        record = self.forget(channel_id)
+        if record is not None and self._db is not None:
+            self._db.execute("DELETE FROM inquiry_channels WHERE channel_id = ?", (channel_id,))
+            self._db.commit()
+        return record
+
+    def forget(self, channel_id: int) -> ChannelRecord | None:
+        # 🔸 메모리에서만 뺌 (다른 프로세스가 맡은 길드의 채널은 저장된 기록을 지우지 않음)
+        record = self._by_channel.pop(channel_id, None)
+        if record is None:
+            return None
+        if self._by_owner.get(record.owner_key) == channel_id:
+            del self._by_owner[record.owner_key]
+        self._dirty.discard(channel_id)
+        return record
+
+    def assign_guild(self, channel_id: int, guild_id: int):
+        # 🔸 길드 정보 없이 저장된 예전 기록 보완 (마지막 활동 시각은 그대로)
+        record = self._by_channel.get(channel_id)
+        if record is None or record.guild_id == guild_id:
+            return
+        if self._by_owner.get(record.owner_key) == channel_id:
+            del self._by_owner[record.owner_key]
+        record.guild_id = guild_id
+        self._remember(record)
+        if self._db is not None:
+            self._db.execute("UPDATE inquiry_channels SET guild_id = ? WHERE channel_id = ?", (guild_id, channel_id))
+            self._db.commit()
+
+    def touch(self, channel_id: int) -> bool:
+        # 🔸 메모리만 갱신하고 디스크 기록은 주기적으로 모아서 처리
+        record = self._by_channel.get(channel_id)
+        if record is None:
+            return False
+        record.last_active = self.clock()
+        self._dirty.add(channel_id)
+        self.stats["touches"] += 1
+        return True
+
+    def channel_of(self, owner_id: int, kind: str = "bot", guild_id: int | None = None) -> int | None:
+        return self._by_owner.get((owner_id, kind, guild_id))
+
+    def get(self, channel_id: int) -> ChannelRecord | None:
+        return self._by_channel.get(channel_id)
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._by_channel
+
+    def __len__(self) -> int:
+        return len(self._by_channel)
+
+    def records(self) -> list[ChannelRecord]:
+        return list(self._by_channel.values())
+
+    def flush(self):
+        if not self._dirty:
+            return
+        rows = [(self._by_channel[cid].last_active, cid) for cid in self._dirty if cid in self._by_channel]
+        self._dirty.clear()
+        if self._db is not None and rows:
+            self._db.executemany("UPDATE inquiry_channels SET last_active = ? WHERE channel_id = ?", rows)
+            self._db.commit()
+        self.stats["flushes"] += 1
+        self.stats["rows_flushed"] += len(rows)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ERROR] 문의 채널 활동 시각 저장 실패: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,143 @@
+import asyncio, json, os, sys
+from types import MappingProxyType
+
+import constants
+from answer_cache import faq_fingerprint
+
+SECTIONS = ("FAQ", "FAQ_2", "BLOCKED_WORDS", "INJECTION_KEYWORDS", "THANK_WORDS")
+
+
+class ContentError(ValueError):
+    pass
+
+
+class ContentSnapshot:
+    """FAQ / 모더레이션 콘텐츠의 불변 스냅샷. 섹션별 버전으로 바뀐 부분만 다시 만들 수 있음."""
+
+    __slots__ = ("faq", "faq_2", "blocked_words", "injection_keywords", "thank_words", "versions", "version", "source")
+
+    def __init__(self, data: dict, source: str):
+        self.faq = MappingProxyType(dict(data["FAQ"]))
+        self.faq_2 = MappingProxyType(dict(data["FAQ_2"]))
+        self.blocked_words = tuple(data["BLOCKED_WORDS"])
+        self.injection_keywords = tuple(data["INJECTION_KEYWORDS"])
+        self.thank_words = tuple(data["THANK_WORDS"])
+        self.versions = MappingProxyType({section: faq_fingerprint(data[section]) for section in SECTIONS})
+        self.version = faq_fingerprint(dict(self.versions))
+        self.source = source
+
+
+def _validate(data) -> dict:
+    if not isinstance(data, dict):
+        raise ContentError("콘텐츠 파일 최상위는 객체여야 합니다.")
+    # 🔸 파일에 없는 섹션은 constants 기본값 사용
+    merged = {section: data.get(section, getattr(constants, section)) for section in SECTIONS}
+    for section in ("FAQ", "FAQ_2"):
+        table = merged[section]
+        if not isinstance(table, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in table.items()):
+            raise ContentError(f"{section}는 문자열 → 문자열 객체여야 합니다.")
+        if not table:
+            raise ContentError(f"{section}가 비어 있습니다.")
+    for section in ("BLOCKED_WORDS", "INJECTION_KEYWORDS", "THANK_WORDS"):
+        words = merged[section]
+        if not isinstance(words, list) or not all(isinstance(w, str) and w for w in words):
+            raise ContentError(f"{section}는 빈 문자열이 없는 문자열 목록이어야 합니다.")
+    return merged
+
+
+def snapshot_from_constants() -> ContentSnapshot:
+    return ContentSnapshot({section: getattr(constants, section) for section in SECTIONS}, "constants")
+
+
+def load_snapshot(path: str) -> ContentSnapshot:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return ContentSnapshot(_validate(data), path)
+
+
+class ContentStore:
+    """콘텐츠 파일 mtime을 감시해서 바뀌면 이벤트 루프 밖에서 읽고 검증한 뒤 스냅샷을 통째로 교체."""
+
+    def __init__(self, path: str | None, poll_interval: float = 5.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.snapshot = snapshot_from_constants()
+        self._mtime: float | None = None
+        self._listeners = []
+        self._task: asyncio.Task | None = None
+        self.stats = {"reloads": 0, "failures": 0}
+
+    def load(self) -> ContentSnapshot:
+        # 🔹 시작 시 동기 로드 (파일이 없으면 constants 사용)
+        if self.path and os.path.exists(self.path):
+            self._mtime = os.path.getmtime(self.path)
+            self.snapshot = load_snapshot(self.path)
+        return self.snapshot
+
+    def on_change(self, callback):
+        # callback(new_snapshot, old_snapshot), 코루틴 함수도 가능
+        self._listeners.append(callback)
+        return callback
+
+    async def reload(self, force: bool = False) -> bool:
+        if not self.path or not os.path.exists(self.path):
+            return False
+        mtime = os.path.getmtime(self.path)
+        if not force and mtime == self._mtime:
+            return False
+        self._mtime = mtime
+
+        try:
+            snapshot = await asyncio.to_thread(load_snapshot, self.path)
+        except (OSError, ValueError) as e:
+            # 🔸 잘못된 파일이면 이전 스냅샷 유지
+            self.stats["failures"] += 1
+            print(f"[ERROR] 콘텐츠 파일 로드 실패, 이전 버전 유지: {e}")
+            return False
+        if snapshot.version == self.snapshot.version:
+            return False
+
+        previous, self.snapshot = self.snapshot, snapshot
+        self.stats["reloads"] += 1
+        for callback in self._listeners:
+            result = callback(snapshot, previous)
+            if asyncio.iscoroutine(result):
+                await result
+        print(f"[INFO] 콘텐츠 다시 로드됨: {previous.version} → {snapshot.version}")
+        return True
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"[ERROR] 콘텐츠 갱신 처리 실패: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def export_constants(path: str):
+    # 🔹 현재 constants.py 내용을 편집 가능한 콘텐츠 파일로 내보냄
+    data = {section: getattr(constants, section) for section in SECTIONS}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "export":
+        export_constants(sys.argv[2])
+        print(f"[INFO] 콘텐츠 파일 생성됨: {sys.argv[2]}")
+    else:
+        print("사용법: python content_store.py export content.json")
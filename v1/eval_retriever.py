@@ -0,0 +1,57 @@
+import json, os, sys, time
+
+import constants
+from faq_matcher import FAQMatcher
+from semantic_retriever import SemanticRetriever
+
+EVAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "retrieval_eval.json")
+
+
+def main(path: str = EVAL_PATH):
+    with open(path, encoding="utf-8") as f:
+        cases = json.load(f)
+
+    faq = constants.FAQ
+    matcher = FAQMatcher(faq)
+    retriever = SemanticRetriever(faq)
+
+    answerable = [case for case in cases if case["expected"]]
+    fuzzy = hits = wrong = false_positive = 0
+    latencies = []
+
+    for case in cases:
+        query, expected = case["query"], case["expected"]
+        # 🔹 기존 경로(정확히 일치 + 유사도)에서 이미 걸리면 검색 단계까지 오지 않음
+        if matcher.best(query, cutoff=0.6):
+            fuzzy += 1
+            continue
+
+        start = time.perf_counter()
+        found = retriever.best(query)
+        latencies.append(time.perf_counter() - start)
+
+        if found is None:
+            if expected:
+                print(f"  miss      {query!r} → (LLM)  expected {expected}")
+            continue
+        if expected is None:
+            false_positive += 1
+            print(f"  false hit {query!r} → {found}")
+        elif faq[found] == faq[expected]:
+            hits += 1
+        else:
+            wrong += 1
+            print(f"  wrong     {query!r} → {found}  expected {expected}")
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6 if latencies else 0.0
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6 if latencies else 0.0
+    reached = len(answerable) - sum(1 for case in answerable if matcher.best(case["query"], cutoff=0.6))
+    print(f"cases={len(cases)} answerable={len(answerable)} handled by fuzzy match={fuzzy}")
+    print(f"retrieval hit rate={hits / reached if reached else 0:.1%} ({hits}/{reached}) wrong={wrong} false positives={false_positive}")
+    print(f"LLM calls avoided={hits + wrong + false_positive}/{len(cases) - fuzzy}")
+    print(f"latency p50={p50:.1f} µs p99={p99:.1f} µs")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,105 @@
+import asyncio, heapq, time
+
+
+class ExpiryScheduler:
+    """채널 만료 스케줄러. 최소 힙으로 다음 마감 시각까지만 자고, 활동 갱신은 지연 무효화로 처리."""
+
+    def __init__(self, on_expire, default_idle: float = 3600 * 12, max_concurrent: int = 2, clock=time.time):
+        self.on_expire = on_expire  # async def on_expire(channel_id, idle_seconds)
+        self.default_idle = default_idle
+        self.clock = clock
+        self._heap: list[tuple[float, int]] = []
+        # 🔹 채널별 현재 마감 시각 / 유휴 정책 (힙에 남은 옛 항목은 꺼낼 때 걸러냄)
+        self._deadlines: dict[int, float] = {}
+        self._idle: dict[int, float] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.stats = {"expired": 0, "failed": 0, "stale_pops": 0}
+
+    def schedule(self, channel_id: int, last_active: float, idle: float | None = None):
+        if idle is not None:
+            self._idle[channel_id] = idle
+        deadline = last_active + self._idle.get(channel_id, self.default_idle)
+        current = self._deadlines.get(channel_id)
+        self._deadlines[channel_id] = deadline
+        if current is None or deadline < current:
+            heapq.heappush(self._heap, (deadline, channel_id))
+            if self._heap[0][1] == channel_id:
+                self._wake.set()
+
+    def bump(self, channel_id: int, last_active: float):
+        # 🔸 마감 시각만 늦추고 힙은 건드리지 않음 (O(1))
+        if channel_id in self._deadlines:
+            self._deadlines[channel_id] = last_active + self._idle.get(channel_id, self.default_idle)
+
+    def cancel(self, channel_id: int):
+        self._deadlines.pop(channel_id, None)
+        self._idle.pop(channel_id, None)
+
+    def deadline(self, channel_id: int) -> float | None:
+        return self._deadlines.get(channel_id)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def next_delay(self) -> float | None:
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
+
+    def pop_due(self) -> list[int]:
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, channel_id = heapq.heappop(self._heap)
+            current = self._deadlines.get(channel_id)
+            if current is None:
+                self.stats["stale_pops"] += 1
+                continue
+            if current > deadline:
+                # 🔸 그 사이 활동이 있었으면 새 마감 시각으로 다시 넣음
+                heapq.heappush(self._heap, (current, channel_id))
+                self.stats["stale_pops"] += 1
+                continue
+            del self._deadlines[channel_id]
+            due.append(channel_id)
+        return due
+
+    async def run_due(self):
+        due = self.pop_due()
+        if due:
+            await asyncio.gather(*(self._expire(channel_id) for channel_id in due))
+
+    async def _expire(self, channel_id: int):
+        idle = self._idle.pop(channel_id, self.default_idle)
+        # 🔹 동시에 삭제하는 채널 수 제한 (Discord 레이트 리밋 대비)
+        async with self._semaphore:
+            try:
+                await self.on_expire(channel_id, idle)
+                self.stats["expired"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"[ERROR] 채널 만료 처리 실패: {channel_id} {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await self.run_due()
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.next_delay())
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,95 @@
+import heapq, re
+
+# 🔹 한글 음절 → 자모 분해용 테이블
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+# 🔹 질문 끝에 붙는 조사/어미 (긴 것부터 검사)
+PARTICLES = sorted([
+    "인가요", "이에요", "에요", "예요", "은요", "는요", "이요", "나요", "까요", "해요", "돼요",
+    "은", "는", "이", "가", "을", "를", "요", "도", "좀",
+], key=len, reverse=True)
+
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def decompose(text: str) -> str:
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(CHOSEONG[code // 588])
+            out.append(JUNGSEONG[(code % 588) // 28])
+            if code % 28:
+                out.append(JONGSEONG[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def strip_particle(token: str) -> str:
+    for particle in PARTICLES:
+        if len(token) > len(particle) + 1 and token.endswith(particle):
+            return token[: -len(particle)]
+    return token
+
+
+def normalize(text: str) -> str:
+    # 🔸 소문자 + 문장부호 제거 + 토큰별 조사 제거 + 띄어쓰기 무시
+    tokens = _PUNCT_RE.sub(" ", text.lower()).split()
+    return "".join(strip_particle(token) for token in tokens)
+
+
+def ngrams(text: str, n: int) -> set[str]:
+    padded = f"^{text}$"
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class FAQMatcher:
+    """FAQ 키에 대한 자모 n-gram 역색인. 시작 시(또는 FAQ 변경 시) 한 번 만들어서 재사용."""
+
+    def __init__(self, faq: dict, n: int = 3):
+        self.n = n
+        self.keys = list(faq.keys())
+        self._exact: dict[str, int] = {}
+        self._sizes: list[int] = []
+        self._postings: dict[str, list[int]] = {}
+
+        for idx, key in enumerate(self.keys):
+            norm = normalize(key)
+            self._exact.setdefault(norm, idx)
+            grams = ngrams(decompose(norm), n)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(idx)
+
+    def lookup(self, text: str, k: int = 5) -> list[tuple[str, float]]:
+        norm = normalize(text)
+        if not norm:
+            return []
+        exact = self._exact.get(norm)
+        if exact is not None:
+            return [(self.keys[exact], 1.0)]
+
+        grams = ngrams(decompose(norm), self.n)
+        overlap: dict[int, int] = {}
+        for gram in grams:
+            for idx in self._postings.get(gram, ()):
+                overlap[idx] = overlap.get(idx, 0) + 1
+        if not overlap:
+            return []
+
+        # 🔹 Dice 계수 = 2|A∩B| / (|A| + |B|)
+        size = len(grams)
+        sizes = self._sizes
+        top = heapq.nlargest(k, overlap.items(), key=lambda item: item[1] / (size + sizes[item[0]]))
+        return [(self.keys[idx], 2 * hits / (size + sizes[idx])) for idx, hits in top]
+
+    def best(self, text: str, cutoff: float = 0.6) -> str | None:
+        candidates = self.lookup(text, k=1)
+        if candidates and candidates[0][1] >= cutoff:
+            return candidates[0][0]
+        return None
@@ -0,0 +1,116 @@
+import time
+from collections import OrderedDict
+
+from answer_cache import normalize_question
+
+# 🔹 LLM 대신 바로 보내는 답변
+CANNED_REPLIES = {
+    "too_short": "조금만 더 자세히 질문해 주시면 찾아볼게요! `도움`을 입력하면 키워드 목록을 볼 수 있어요.",
+    "no_text": "😊 궁금한 점이 있으면 편하게 물어봐 주세요! `도움`을 입력하면 키워드 목록을 볼 수 있어요.",
+    "duplicate": "방금 같은 질문을 받았어요. 위 답변을 확인해 주세요 🙏",
+    "known_miss": "죄송해요, 그 내용은 잘 모르겠어요 😢 `!문의-운영진`으로 운영진에게 직접 물어봐 주세요.",
+}
+
+
+def _is_jamo(ch: str) -> bool:
+    # 🔸 ㅋㅋ / ㅎㅎ / ㅠㅠ 같은 자음·모음만 있는 입력
+    return "ㄱ" <= ch <= "ㆎ"
+
+
+class _RecentSet:
+    """최근 항목을 시각과 함께 보관. 크기 제한 + 유효 시간."""
+
+    __slots__ = ("max_size", "ttl", "clock", "_items")
+
+    def __init__(self, max_size: int, ttl: float, clock):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._items: OrderedDict = OrderedDict()
+
+    def seen(self, key, now: float) -> bool:
+        at = self._items.get(key)
+        if at is None:
+            return False
+        if now - at > self.ttl:
+            del self._items[key]
+            return False
+        return True
+
+    def add(self, key, now: float):
+        self._items[key] = now
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class FastPath:
+    """FAQ 매칭에 실패한 입력을 LLM에 보내기 전에 거르는 저비용 분류기.
+
+    너무 짧은 입력, 이모지 / 문장부호 / 자모뿐인 입력, 방금 답을 받은 같은 사용자의 반복은
+    classify()가, 최근에 LLM이 답을 내지 못한 입력(차단 / 빈 응답)은 known_miss()가 걸러냄.
+    """
+
+    def __init__(
+        self,
+        min_chars: int = 2,
+        duplicate_window: float = 30.0,
+        miss_ttl: float = 600.0,
+        max_size: int = 1024,
+        clock=time.monotonic,
+    ):
+        self.min_chars = min_chars
+        self.clock = clock
+        self._recent = _RecentSet(max_size, duplicate_window, clock)
+        self._misses = _RecentSet(max_size, miss_ttl, clock)
+        self.stats = {"checked": 0, "too_short": 0, "no_text": 0, "duplicate": 0, "known_miss": 0, "misses": 0}
+
+    def classify(self, text: str, user_id=None) -> str | None:
+        self.stats["checked"] += 1
+        reason = self._classify(normalize_question(text), user_id)
+        if reason:
+            self.stats[reason] += 1
+        return reason
+
+    def _classify(self, question: str, user_id) -> str | None:
+        letters = [ch for ch in question if ch.isalnum()]
+        if not letters or all(_is_jamo(ch) for ch in letters):
+            return "no_text"
+        if len(letters) < self.min_chars:
+            return "too_short"
+        # 🔸 같은 사용자가 방금 답을 받은 질문을 또 보내면 한 번만 처리
+        if self._recent.seen((user_id, question), self.clock()):
+            return "duplicate"
+        return None
+
+    def answered(self, text: str, user_id=None):
+        # 🔹 실제 답을 보낸 뒤에만 기록 (시간 초과 / 오류 / 한도 초과 후 재시도는 다시 처리)
+        self._recent.add((user_id, normalize_question(text)), self.clock())
+
+    def known_miss(self, text: str) -> bool:
+        if not self._misses.seen(normalize_question(text), self.clock()):
+            return False
+        self.stats["known_miss"] += 1
+        return True
+
+    def remember_miss(self, text: str):
+        # 🔹 LLM도 답을 내지 못한 입력(차단 / 빈 응답) → 유효 시간 동안은 같은 입력에 바로 안내 문구
+        self._misses.add(normalize_question(text), self.clock())
+        self.stats["misses"] += 1
+
+    def reply(self, reason: str) -> str:
+        return CANNED_REPLIES[reason]
+
+    def snapshot(self) -> dict:
+        # 🔸 걸러낸 비율 = LLM 경로에서 빠진 트래픽
+        filtered = sum(self.stats[reason] for reason in ("too_short", "no_text", "duplicate", "known_miss"))
+        return dict(
+            self.stats,
+            passed=self.stats["checked"] - filtered,
+            filtered=filtered,
+            filtered_ratio=filtered / self.stats["checked"] if self.stats["checked"] else 0.0,
+            cached_misses=len(self._misses),
+        )
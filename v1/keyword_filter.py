@@ -0,0 +1,80 @@
+from collections import deque
+
+
+class _Automaton:
+    """Aho-Corasick 오토마톤. 한 번 훑어서 모든 키워드 카테고리를 찾음."""
+
+    __slots__ = ("goto", "fail", "out")
+
+    def __init__(self, categories: dict[str, list[str]]):
+        self.goto: list[dict[str, int]] = [{}]
+
+        # 🔹 트라이 구성
+        pending: list[set[str]] = [set()]
+        for category, words in categories.items():
+            for word in words:
+                word = word.lower()
+                if not word:
+                    continue
+                state = 0
+                for ch in word:
+                    nxt = self.goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(self.goto)
+                        self.goto[state][ch] = nxt
+                        self.goto.append({})
+                        pending.append(set())
+                    state = nxt
+                pending[state].add(category)
+
+        # 🔹 BFS로 실패 링크 계산 + 출력 병합
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                pending[nxt] |= pending[self.fail[nxt]]
+        self.out = [frozenset(cats) for cats in pending]
+
+    def scan(self, text: str, total: int) -> frozenset[str]:
+        goto, fail, out = self.goto, self.fail, self.out
+        hits: set[str] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits |= out[state]
+                if len(hits) == total:
+                    break
+        return frozenset(hits)
+
+
+class KeywordFilter:
+    """차단어 / 프롬프트 인젝션 / 감사 인사 등 키워드 카테고리를 한 번에 분류."""
+
+    def __init__(self, categories: dict[str, list[str]]):
+        self.rebuild(categories)
+
+    @staticmethod
+    def compile(categories: dict[str, list[str]]) -> tuple:
+        # 🔹 오토마톤 생성만 함 (워커 스레드에서 호출 가능). 교체는 install()
+        return _Automaton(categories), len([c for c, words in categories.items() if any(words)])
+
+    def install(self, compiled: tuple):
+        # 🔸 참조만 교체 (진행 중인 분류는 이전 버전으로 끝남)
+        self._state = compiled
+
+    def rebuild(self, categories: dict[str, list[str]]):
+        self.install(self.compile(categories))
+
+    def classify(self, text: str) -> frozenset[str]:
+        automaton, total = self._state
+        return automaton.scan(text.lower(), total)
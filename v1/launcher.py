@@ -0,0 +1,82 @@
+import argparse, os, signal, subprocess, sys, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BOT_PATH = os.path.join(HERE, "marong_bot_v1.py")
+
+
+def shard_plan(processes: int, shards: int) -> list[list[int]]:
+    # 🔹 샤드를 프로세스에 번갈아 배정 (0, P, 2P, ... / 1, P+1, ...)
+    return [list(range(index, shards, processes)) for index in range(processes)]
+
+
+def spawn(index: int, processes: int, shards: int, shard_ids: list[int], state_path: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        SHARD_COUNT=str(shards),
+        SHARD_IDS=",".join(map(str, shard_ids)),
+        PROCESS_INDEX=str(index),
+        PROCESS_COUNT=str(processes),
+        STATE_BACKEND=os.getenv("STATE_BACKEND", "local"),
+        STATE_PATH=state_path,
+    )
+    print(f"[INFO] 프로세스 {index} 시작: 샤드 {shard_ids}")
+    return subprocess.Popen([sys.executable, BOT_PATH], env=env, cwd=os.getcwd())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="샤드를 여러 프로세스로 나눠 봇 실행")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shards", type=int, help="전체 샤드 수 (기본: 프로세스 수)")
+    parser.add_argument("--state-path", default=os.getenv("STATE_PATH", "./data/state.sqlite3"))
+    parser.add_argument("--max-backoff", type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    shards = args.shards or args.processes
+    processes = min(args.processes, shards)
+    plan = shard_plan(processes, shards)
+    children = {index: spawn(index, processes, shards, ids, args.state_path) for index, ids in enumerate(plan)}
+    backoff = {index: 1.0 for index in children}
+    started = {index: time.monotonic() for index in children}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    # 🔹 죽은 프로세스는 지수 백오프로 다시 띄움 (같은 샤드 그대로)
+    restart_at: dict[int, float] = {}
+    while not stopping:
+        time.sleep(0.5)
+        now = time.monotonic()
+        for index, child in children.items():
+            if index in restart_at:
+                if now >= restart_at[index]:
+                    del restart_at[index]
+                    children[index] = spawn(index, processes, shards, plan[index], args.state_path)
+                    started[index] = now
+                continue
+            code = child.poll()
+            if code is None:
+                continue
+            if now - started[index] > args.max_backoff:
+                backoff[index] = 1.0  # 🔸 한동안 잘 돌았으면 백오프 초기화
+            print(f"[WARN] 프로세스 {index} 종료 (코드 {code}), {backoff[index]:.0f}초 후 재시작")
+            restart_at[index] = now + backoff[index]
+            backoff[index] = min(args.max_backoff, backoff[index] * 2)
+
+    print("[INFO] 모든 프로세스 종료 중")
+    for child in children.values():
+        if child.poll() is None:
+            child.send_signal(signal.SIGINT)
+    for child in children.values():
+        try:
+            child.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            child.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import asyncio, random, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class NoAnswer(Exception):
+    """모델이 답을 내지 않음 (안전 필터 차단 / 빈 응답). 일시적인 오류와 달리 같은 질문이면 또 실패함."""
+
+
+def response_text(response) -> str:
+    # 🔸 차단된 응답은 .text 접근 시 ValueError
+    try:
+        text = getattr(response, "text", "")
+    except ValueError as e:
+        raise NoAnswer(str(e)) from e
+    return text or ""
+
+
+class LLMDispatcher:
+    """동기 LLM 클라이언트(generate_content)를 이벤트 루프 밖에서 호출하는 비동기 디스패처."""
+
+    def __init__(self, model, max_concurrency: int = 4, timeout: float = 20.0):
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        # 🔹 워커 수 = 동시 호출 상한. 자리는 워커 스레드가 실제로 끝날 때 반납 (타임아웃 난 호출도 끝날 때까지 차지함)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm")
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # 🔹 진행 중인 호출: key -> [task, 대기자 수]
+        self._inflight: dict[str, list] = {}
+        self.stats = {"calls": 0, "streams": 0, "coalesced": 0, "timeouts": 0, "errors": 0, "no_answer": 0, "cancelled": 0}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def generate(self, prompt: str, key: str | None = None, timeout: float | None = None) -> str:
+        key = key if key is not None else prompt
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(self._call(prompt, timeout if timeout is not None else self.timeout))
+            entry = [task, 0]
+            self._inflight[key] = entry
+            task.add_done_callback(lambda _t: self._forget(key, entry))
+        else:
+            # 🔸 같은 질문이 이미 진행 중이면 업스트림 호출을 공유
+            self.stats["coalesced"] += 1
+
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        except asyncio.CancelledError:
+            # 🔸 마지막 대기자가 취소되면 업스트림 대기도 취소
+            if entry[1] == 1 and not entry[0].done():
+                entry[0].cancel()
+                self.stats["cancelled"] += 1
+            raise
+        finally:
+            entry[1] -= 1
+
+    def _forget(self, key: str, entry: list):
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+
+    async def _submit(self, fn, *args) -> asyncio.Future:
+        # 🔸 자리를 잡고 워커에 넘김. 반납은 await가 아니라 워커 스레드 종료 시점
+        #    (wait_for 타임아웃 / 취소 후에도 스레드가 돌고 있으면 새 호출은 기다림)
+        loop = asyncio.get_running_loop()
+        await self._semaphore.acquire()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        def release(_f):
+            try:
+                loop.call_soon_threadsafe(self._semaphore.release)
+            except RuntimeError:
+                pass  # 🔸 루프가 이미 닫힘 (종료 중)
+
+        future.add_done_callback(release)
+        return asyncio.wrap_future(future)
+
+    async def _call(self, prompt: str, timeout: float) -> str:
+        future = await self._submit(self._generate_sync, prompt)
+        self.stats["calls"] += 1
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        except asyncio.CancelledError:
+            raise
+        except NoAnswer:
+            self.stats["no_answer"] += 1
+            raise
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+    async def stream(self, prompt: str, timeout: float | None = None):
+        """generate_content(stream=True)의 조각을 받는 대로 내보내는 비동기 제너레이터."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        stop = threading.Event()
+
+        def worker():
+            # 🔹 워커 스레드에서 조각을 읽어 이벤트 루프 큐로 넘김
+            try:
+                for chunk in self.model.generate_content(prompt, stream=True):
+                    if stop.is_set():
+                        break
+                    text = response_text(chunk)
+                    if text:
+                        loop.call_soon_threadsafe(queue.put_nowait, text)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+        await self._submit(worker)
+        self.stats["calls"] += 1
+        self.stats["streams"] += 1
+        deadline = loop.time() + (timeout if timeout is not None else self.timeout)
+        received = False
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time()))
+                if item is finished:
+                    if not received:
+                        self.stats["no_answer"] += 1
+                        raise NoAnswer("빈 응답")
+                    return
+                if isinstance(item, NoAnswer):
+                    self.stats["no_answer"] += 1
+                    raise item
+                if isinstance(item, Exception):
+                    self.stats["errors"] += 1
+                    raise item
+                received = received or bool(item.strip())
+                yield item
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        finally:
+            # 🔸 중간에 끊기면 워커도 다음 조각에서 멈춤 (자리는 워커가 끝날 때 반납)
+            stop.set()
+
+    def _generate_sync(self, prompt: str) -> str:
+        text = response_text(self.model.generate_content(prompt))
+        if not text.strip():
+            raise NoAnswer("빈 응답")
+        return text
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """로컬 테스트용 가짜 모델. 지정한 지연 후 프롬프트 마지막 줄을 돌려줌."""
+
+    def __init__(self, latency=0.5, fail_rate: float = 0.0, chunk_delay: float = 0.05, answer: str | None = None):
+        # 🔸 latency는 초 단위 숫자 또는 호출마다 지연을 뽑는 함수 (예: lambda: random.lognormvariate(-1, 0.5))
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.chunk_delay = chunk_delay
+        self.answer = answer
+        self.calls = 0
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        self.calls += 1
+        time.sleep(self.latency() if callable(self.latency) else self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            raise RuntimeError("fake model failure")
+        lines = [line.strip() for line in prompt.strip().splitlines() if line.strip()]
+        text = self.answer if self.answer is not None else f"[fake] {lines[-1] if lines else ''}"
+        if stream:
+            return self._stream(text)
+        return FakeResponse(text)
+
+    def _stream(self, text: str):
+        # 🔹 단어 단위로 지연을 두고 조각을 내보냄
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield FakeResponse(word if i == len(words) - 1 else word + " ")
+
+
+if __name__ == "__main__":
+    # 🔹 가짜 모델로 동시성 상한 / 요청 합치기 / 타임아웃 확인
+    async def _demo():
+        fake = FakeModel(latency=0.3)
+        dispatcher = LLMDispatcher(fake, max_concurrency=2, timeout=1.0)
+        start = time.perf_counter()
+        prompts = ["매칭 언제?"] * 5 + [f"질문 {i}" for i in range(4)]
+        results = await asyncio.gather(*(dispatcher.generate(p) for p in prompts))
+        elapsed = time.perf_counter() - start
+        print(f"results={len(results)} upstream_calls={fake.calls} elapsed={elapsed:.2f}s stats={dispatcher.stats}")
+
+        slow = LLMDispatcher(FakeModel(latency=2.0), max_concurrency=1, timeout=0.2)
+        try:
+            await slow.generate("느린 질문")
+        except asyncio.TimeoutError:
+            print(f"timeout ok stats={slow.stats}")
+        dispatcher.close()
+        slow.close()
+
+    asyncio.run(_demo())
@@ -0,0 +1,83 @@
+import asyncio, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from answer_cache import faq_fingerprint
+from faq_matcher import FAQMatcher
+from semantic_retriever import SemanticRetriever
+
+NEEDS_INDEX = "needs-index"
+
+
+def local_match(faq: dict, matcher: FAQMatcher, retriever: SemanticRetriever, text: str) -> tuple[str, str] | None:
+    """LLM 없이 찾을 수 있는 FAQ 키와 출처("faq" / "retrieval"). 못 찾으면 None."""
+    # 🔹 정확히 일치
+    if text in faq:
+        return text, "faq"
+
+    # 🔹 유사도 기반 매칭 (조사/띄어쓰기 무시)
+    best_key = matcher.best(text, cutoff=0.6)
+    if best_key:
+        return best_key, "faq"
+
+    # 🔹 의미 기반 검색 (확신할 때만 LLM 호출 생략)
+    retrieved_key = retriever.best(text)
+    if retrieved_key:
+        return retrieved_key, "retrieval"
+    return None
+
+
+# 🔸 워커 프로세스마다 현재 버전의 인덱스 하나만 보관
+_worker: dict = {"version": None}
+
+
+def _match_in_worker(version: str, text: str, faq: dict | None = None, threshold: float = 0.3):
+    if _worker["version"] != version:
+        if faq is None:
+            return NEEDS_INDEX
+        _worker.update(
+            version=version,
+            faq=faq,
+            matcher=FAQMatcher(faq),
+            retriever=SemanticRetriever(faq, threshold=threshold),
+        )
+    return local_match(_worker["faq"], _worker["matcher"], _worker["retriever"], text)
+
+
+class MatchPool:
+    """FAQ 매칭을 워커 프로세스에서 실행. 이벤트 루프가 CPU 작업에 묶이지 않고 여러 코어를 씀.
+
+    FAQ가 바뀌면 버전만 올리고, 각 워커는 처음 새 버전 요청을 받을 때 인덱스를 다시 만듦.
+    """
+
+    def __init__(self, faq: dict, workers: int = 2, threshold: float = 0.3):
+        self.workers = max(1, workers)
+        self.threshold = threshold
+        # 🔸 fork: 봇 모듈을 다시 import하지 않음. 스레드가 뜨기 전에 warm()으로 워커를 미리 띄울 것
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork"))
+        self.stats = {"calls": 0, "index_loads": 0}
+        self.update(faq)
+
+    def update(self, faq: dict):
+        self.faq = dict(faq)
+        self.version = faq_fingerprint(self.faq)
+
+    def warm(self):
+        futures = [
+            self._pool.submit(_match_in_worker, self.version, "", self.faq, self.threshold)
+            for _ in range(self.workers)
+        ]
+        for future in futures:
+            future.result()
+
+    async def match(self, text: str) -> tuple[str, str] | None:
+        loop = asyncio.get_running_loop()
+        self.stats["calls"] += 1
+        result = await loop.run_in_executor(self._pool, _match_in_worker, self.version, text, None, self.threshold)
+        if result == NEEDS_INDEX:
+            # 🔸 이 워커는 아직 이전 버전 → FAQ를 같이 보내서 다시 요청
+            self.stats["index_loads"] += 1
+            result = await loop.run_in_executor(self._pool, _match_in_worker, self.version, text, self.faq, self.threshold)
+        return result
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,185 @@
+import asyncio, json, os, time
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PREFIX = "marong_"
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * (size + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Timer:
+    __slots__ = ("metrics", "key", "start")
+
+    def __init__(self, metrics, key):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics._observe_key(self.key, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """카운터 / 히스토그램 / 게이지. 꺼져 있으면 모든 호출이 아무 일도 하지 않음."""
+
+    def __init__(self, enabled: bool = True, buckets: tuple = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._counters: dict[tuple, float] = {}
+        self._histograms: dict[tuple, _Histogram] = {}
+        self._gauges: dict[str, object] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        if self.enabled:
+            self._observe_key(self._key(name, labels), value)
+
+    def _observe_key(self, key: tuple, value: float):
+        hist = self._histograms.get(key)
+        if hist is None:
+            hist = self._histograms[key] = _Histogram(len(self.buckets))
+        hist.counts[bisect_left(self.buckets, value)] += 1
+        hist.sum += value
+        hist.count += 1
+
+    def timer(self, stage: str, **labels):
+        # 🔹 with metrics.timer("match"): ...  → marong_stage_seconds{stage="match"}
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, self._key("stage_seconds", dict(labels, stage=stage)))
+
+    def gauge(self, name: str, fn):
+        # 🔸 게이지는 내보낼 때만 fn()을 호출 (숫자 또는 {라벨값: 숫자})
+        self._gauges[name] = fn
+
+    def _gauge_values(self):
+        for name, fn in self._gauges.items():
+            try:
+                value = fn()
+            except Exception:
+                continue
+            if isinstance(value, dict):
+                for label, v in value.items():
+                    yield name, (("key", str(label)),), v
+            else:
+                yield name, (), value
+
+    def snapshot(self) -> dict:
+        fmt = lambda name, labels: name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+        histograms = {}
+        for (name, labels), hist in self._histograms.items():
+            histograms[fmt(name, labels)] = {
+                "count": hist.count,
+                "sum": hist.sum,
+                "p50": self._quantile(hist, 0.50),
+                "p95": self._quantile(hist, 0.95),
+                "p99": self._quantile(hist, 0.99),
+            }
+        return {
+            "time": time.time(),
+            "counters": {fmt(name, labels): value for (name, labels), value in self._counters.items()},
+            "histograms": histograms,
+            "gauges": {fmt(name, labels): value for name, labels, value in self._gauge_values()},
+        }
+
+    def _quantile(self, hist: _Histogram, q: float) -> float:
+        # 🔸 버킷 상한으로 근사
+        if not hist.count:
+            return 0.0
+        target = q * hist.count
+        seen = 0
+        for i, count in enumerate(hist.counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def render_prometheus(self) -> str:
+        label_str = lambda labels: "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}" if labels else ""
+        lines = []
+        for (name, labels), value in sorted(self._counters.items()):
+            lines.append(f"{PREFIX}{name}{label_str(labels)} {value}")
+        for (name, labels), hist in sorted(self._histograms.items()):
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], hist.counts):
+                cumulative += count
+                lines.append(f"{PREFIX}{name}_bucket{label_str(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{label_str(labels)} {hist.sum}")
+            lines.append(f"{PREFIX}{name}_count{label_str(labels)} {hist.count}")
+        for name, labels, value in self._gauge_values():
+            lines.append(f"{PREFIX}{name}{label_str(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+async def serve_prometheus(metrics: Metrics, host: str = "127.0.0.1", port: int = 9108):
+    """/metrics 를 텍스트로 내보내는 아주 작은 HTTP 서버."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = metrics.render_prometheus().encode("utf-8")
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def write_snapshots(metrics: Metrics, path: str, interval: float = 30.0):
+    """주기적으로 JSON 스냅샷 파일을 원자적으로 갱신."""
+
+    def write(data: dict):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(write, metrics.snapshot())
+        except Exception as e:
+            print(f"[ERROR] 지표 스냅샷 저장 실패: {e}")
@@ -0,0 +1,281 @@
+import asyncio, heapq, os, random, sqlite3, time
+
+PENDING, SENT, BLOCKED, FAILED = "pending", "sent", "blocked", "failed"
+
+
+class DMJob:
+    __slots__ = ("member_id", "parts_sent", "attempts", "next_attempt")
+
+    def __init__(self, member_id: int, parts_sent: int = 0, attempts: int = 0, next_attempt: float = 0.0):
+        self.member_id = member_id
+        self.parts_sent = parts_sent
+        self.attempts = attempts
+        self.next_attempt = next_attempt
+
+
+class OnboardingPipeline:
+    """가입자 환영 메시지는 짧은 구간 단위로 묶어서 한 번에, 안내 DM은 백그라운드에서 속도를 맞춰 전송.
+
+    진행 상황(환영 여부 / DM 몇 번째 조각까지 보냈는지)은 SQLite에 남겨서 재시작해도 중복 / 누락이 없음.
+    """
+
+    def __init__(
+        self,
+        send_welcome,
+        send_dm,
+        dm_parts,
+        db_path: str | None = "./data/onboarding.sqlite3",
+        batch_window: float = 10.0,
+        max_batch: int = 50,
+        dm_interval: float = 1.0,
+        max_attempts: int = 5,
+        backoff: float = 30.0,
+        permanent_errors: tuple = (),
+        clock=time.time,
+    ):
+        self.send_welcome = send_welcome  # async (member_ids) -> None
+        self.send_dm = send_dm  # async (member_id, text) -> None
+        self.dm_parts = dm_parts  # () -> 현재 안내 DM 조각들
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.dm_interval = dm_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.permanent_errors = permanent_errors
+        self.clock = clock
+
+        self._batch: list[int] = []
+        self._batch_task: asyncio.Task | None = None
+        self._flushing = False
+        self._jobs: dict[int, DMJob] = {}
+        self._heap: list[tuple[float, int]] = []
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._since_report = {SENT: 0, BLOCKED: 0, FAILED: 0}
+        self._db = None
+        self.stats = {"joined": 0, "batches": 0, "welcomed": 0, "dm_sent": 0, "dm_blocked": 0, "dm_failed": 0, "retries": 0}
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS onboarding ("
+                " member_id INTEGER PRIMARY KEY, joined_at REAL NOT NULL, welcomed INTEGER NOT NULL,"
+                " dm_status TEXT NOT NULL, parts_sent INTEGER NOT NULL, attempts INTEGER NOT NULL,"
+                " next_attempt REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def load(self) -> int:
+        # 🔹 재시작 전에 못 끝낸 환영 / DM 복원
+        if self._db is None:
+            return 0
+        rows = self._db.execute(
+            "SELECT member_id, welcomed, dm_status, parts_sent, attempts, next_attempt FROM onboarding"
+            " WHERE welcomed = 0 OR dm_status = ? ORDER BY joined_at", (PENDING,)
+        ).fetchall()
+        for member_id, welcomed, dm_status, parts_sent, attempts, next_attempt in rows:
+            if not welcomed:
+                self._batch.append(member_id)
+            if dm_status == PENDING:
+                self._push(DMJob(member_id, parts_sent, attempts, next_attempt))
+        return len(rows)
+
+    @property
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    def join(self, member_id: int):
+        if member_id in self._jobs or member_id in self._batch:
+            return
+        now = self.clock()
+        self.stats["joined"] += 1
+        if self._db is not None:
+            # 🔸 다시 들어온 멤버는 처음부터 다시 안내
+            self._db.execute(
+                "INSERT OR REPLACE INTO onboarding VALUES (?, ?, 0, ?, 0, 0, ?)", (member_id, now, PENDING, now)
+            )
+            self._db.commit()
+        self._batch.append(member_id)
+        self._push(DMJob(member_id, next_attempt=now))
+        self._schedule_batch(immediate=len(self._batch) >= self.max_batch)
+
+    def _push(self, job: DMJob):
+        self._jobs[job.member_id] = job
+        heapq.heappush(self._heap, (job.next_attempt, job.member_id))
+        self._wake.set()
+
+    def _save(self, job: DMJob, status: str = PENDING):
+        if self._db is not None:
+            self._db.execute(
+                "UPDATE onboarding SET dm_status = ?, parts_sent = ?, attempts = ?, next_attempt = ? WHERE member_id = ?",
+                (status, job.parts_sent, job.attempts, job.next_attempt, job.member_id),
+            )
+            self._db.commit()
+
+    # --- 환영 메시지 묶음 ---
+    def _schedule_batch(self, immediate: bool = False):
+        if self._batch_task is not None and not self._batch_task.done():
+            # 🔸 이미 보내는 중이면 그 루프가 새로 들어온 멤버까지 처리함
+            if not immediate or self._flushing:
+                return
+            self._batch_task.cancel()
+        self._batch_task = asyncio.create_task(self._flush_batch(0 if immediate else self.batch_window))
+
+    async def _flush_batch(self, delay: float):
+        # 🔹 첫 가입 후 batch_window 동안 들어온 멤버를 한 메시지로 묶음 (구간이 밀리지 않도록 고정 창)
+        if delay:
+            await asyncio.sleep(delay)
+        self._flushing = True
+        try:
+            await self._send_batches()
+        finally:
+            self._flushing = False
+
+    async def _send_batches(self):
+        while self._batch:
+            batch, self._batch = self._batch[:self.max_batch], self._batch[self.max_batch:]
+            try:
+                await self.send_welcome(batch)
+            except Exception as e:
+                print(f"[ERROR] 환영 메시지 전송 실패 ({len(batch)}명): {e}")
+                self._batch = batch + self._batch
+                self._batch_task = asyncio.create_task(self._flush_batch(self.batch_window))
+                return
+            if self._db is not None:
+                self._db.executemany("UPDATE onboarding SET welcomed = 1 WHERE member_id = ?", [(m,) for m in batch])
+                self._db.commit()
+            self.stats["batches"] += 1
+            self.stats["welcomed"] += len(batch)
+            print(f"[INFO] 환영 메시지 전송: {len(batch)}명")
+
+    # --- 안내 DM 워커 ---
+    def next_delay(self) -> float | None:
+        while self._heap:
+            due, member_id = self._heap[0]
+            job = self._jobs.get(member_id)
+            if job is None or job.next_attempt != due:
+                heapq.heappop(self._heap)  # 🔸 이미 끝났거나 재시도 시각이 바뀐 항목
+                continue
+            return max(0.0, due - self.clock())
+        return None
+
+    async def deliver(self, job: DMJob) -> str:
+        parts = self.dm_parts()
+        try:
+            while job.parts_sent < len(parts):
+                await self.send_dm(job.member_id, parts[job.parts_sent])
+                # 🔸 조각마다 기록 → 재시작하면 보내지 않은 조각부터 이어서 보냄
+                job.parts_sent += 1
+                self._save(job)
+        except self.permanent_errors:
+            return BLOCKED
+        except Exception as e:
+            job.attempts += 1
+            if job.attempts >= self.max_attempts:
+                print(f"[WARN] 안내 DM 포기 ({job.member_id}): {e}")
+                return FAILED
+            job.next_attempt = self.clock() + self.backoff * 2 ** (job.attempts - 1) * random.uniform(0.8, 1.2)
+            self.stats["retries"] += 1
+            return PENDING
+        return SENT
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            delay = self.next_delay()
+            if delay is None or delay > 0:
+                if delay is None and any(self._since_report.values()):
+                    self._report()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, member_id = heapq.heappop(self._heap)
+            job = self._jobs[member_id]
+            status = await self.deliver(job)
+            self._save(job, status)
+            if status == PENDING:
+                heapq.heappush(self._heap, (job.next_attempt, member_id))
+            else:
+                del self._jobs[member_id]
+                self._since_report[status] += 1
+                self.stats[f"dm_{status}"] += 1
+            await asyncio.sleep(self.dm_interval)
+
+    def _report(self):
+        # 🔹 실패를 한 줄씩 찍지 않고 큐가 빌 때마다 한 번에 요약
+        counts = self._since_report
+        print(f"[INFO] 안내 DM 전송 {counts[SENT]}건 / DM 차단 {counts[BLOCKED]}건 / 실패 {counts[FAILED]}건")
+        self._since_report = {SENT: 0, BLOCKED: 0, FAILED: 0}
+
+    def start(self):
+        if self._batch and (self._batch_task is None or self._batch_task.done()):
+            self._schedule_batch()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        # 🔸 못 보낸 환영 / DM은 DB에 남아 있다가 다음 실행에서 이어서 처리
+        for task in (self._task, self._batch_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._batch_task = None
+        if any(self._since_report.values()):
+            self._report()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+if __name__ == "__main__":
+    # 🔹 가짜 전송으로 묶음 / 재시도 / 재시작 후 이어 보내기 확인
+    import tempfile
+
+    async def _demo(db_path: str):
+        sent: list[tuple[int, str]] = []
+        welcomes: list[list[int]] = []
+        failures: dict[int, int] = {}
+
+        async def send_welcome(member_ids):
+            welcomes.append(list(member_ids))
+
+        async def send_dm(member_id, text):
+            if member_id % 10 == 3:
+                raise PermissionError("DM 차단")
+            if member_id % 10 == 7 and failures.get(member_id, 0) < 2:
+                failures[member_id] = failures.get(member_id, 0) + 1
+                raise RuntimeError("일시적 오류")
+            sent.append((member_id, text))
+
+        parts = lambda: ("안내 1/2", "안내 2/2")
+        first = OnboardingPipeline(send_welcome, send_dm, parts, db_path=db_path, batch_window=0.05,
+                                   max_batch=8, dm_interval=0.01, backoff=0.05, permanent_errors=(PermissionError,))
+        first.start()
+        for member_id in range(20):
+            first.join(member_id)
+        await asyncio.sleep(0.02)
+        await first.close()  # 🔸 도중에 재시작
+        print(f"before restart: welcomes={[len(w) for w in welcomes]} dm parts sent={len(sent)}")
+
+        second = OnboardingPipeline(send_welcome, send_dm, parts, db_path=db_path, batch_window=0.05,
+                                    max_batch=8, dm_interval=0.01, backoff=0.05, permanent_errors=(PermissionError,))
+        print(f"restored={second.load()}")
+        second.start()
+        while second.pending or second._batch:
+            await asyncio.sleep(0.05)
+        duplicates = len(sent) - len(set(sent))
+        print(f"after restart: welcomes={[len(w) for w in welcomes]} dm parts sent={len(sent)} duplicates={duplicates}")
+        print(f"stats={second.stats}")
+        await second.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_demo(os.path.join(tmp, "onboarding.sqlite3")))
@@ -0,0 +1,261 @@
+import asyncio, heapq, itertools, time
+from collections import deque
+
+# 🔹 숫자가 작을수록 먼저 전송
+PRIORITY_REPLY = 0
+PRIORITY_SYSTEM = 1
+PRIORITY_WELCOME = 2
+
+MESSAGE_LIMIT = 2000
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated", "clock")
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        # 🔸 토큰 하나가 생길 때까지 남은 시간 (0이면 바로 사용 가능)
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class _Outgoing:
+    __slots__ = ("priority", "seq", "destination", "kwargs", "future", "enqueued_at", "coalesce")
+
+    def __init__(self, priority, seq, destination, kwargs, future, enqueued_at, coalesce=True):
+        self.priority = priority
+        self.seq = seq
+        self.destination = destination
+        self.kwargs = kwargs
+        self.future = future
+        self.enqueued_at = enqueued_at
+        self.coalesce = coalesce
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    @property
+    def text_only(self) -> bool:
+        # 🔸 나중에 수정할 메시지(coalesce=False)는 다른 답변과 합치지 않음
+        return self.coalesce and set(self.kwargs) == {"content"}
+
+
+class OutboundScheduler:
+    """Discord 전송을 한곳에서 처리. 경로(채널)별 토큰 버킷 + 전역 버킷, 우선순위, 같은 채널 메시지 합치기."""
+
+    def __init__(self, route_rate: float = 0.6, route_burst: int = 2, global_rate: float = 40.0, global_burst: int = 40, clock=time.monotonic, metrics=None):
+        self.metrics = metrics
+        self.route_rate = route_rate
+        self.route_burst = route_burst
+        self.clock = clock
+        self._global = TokenBucket(global_rate, global_burst, clock)
+        self._global_waiters: list[tuple[int, int]] = []
+        self._global_cond = asyncio.Condition()
+        self._buckets: dict[object, TokenBucket] = {}
+        self._lanes: dict[object, list[_Outgoing]] = {}
+        self._workers: dict[object, asyncio.Task] = {}
+        self._seq = itertools.count()
+        self._latencies: deque[float] = deque(maxlen=1024)
+        self.stats = {"queued": 0, "sent": 0, "coalesced": 0, "failed": 0, "max_latency": 0.0}
+
+    @staticmethod
+    def route_of(destination) -> object:
+        return getattr(destination, "id", None) or id(destination)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def send(self, destination, content: str | None = None, priority: int = PRIORITY_REPLY, coalesce: bool = True, **kwargs) -> asyncio.Future:
+        if content is not None:
+            kwargs["content"] = content
+        future = asyncio.get_running_loop().create_future()
+        route = self.route_of(destination)
+        item = _Outgoing(priority, next(self._seq), destination, kwargs, future, self.clock(), coalesce)
+        heapq.heappush(self._lanes.setdefault(route, []), item)
+        self.stats["queued"] += 1
+
+        worker = self._workers.get(route)
+        if worker is None or worker.done():
+            self._workers[route] = asyncio.create_task(self._drain(route))
+        return future
+
+    async def _drain(self, route):
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            bucket = self._buckets[route] = TokenBucket(self.route_rate, self.route_burst, self.clock)
+        lane = self._lanes[route]
+        try:
+            while lane:
+                delay = bucket.delay()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                bucket.take()
+                batch = self._take_batch(lane)
+                await self._acquire_global(batch[0].priority)
+                await self._deliver(batch)
+        finally:
+            if not lane:
+                self._lanes.pop(route, None)
+                self._workers.pop(route, None)
+
+    def _take_batch(self, lane: list[_Outgoing]) -> list[_Outgoing]:
+        first = heapq.heappop(lane)
+        batch = [first]
+        if not first.text_only:
+            return batch
+        # 🔸 같은 채널에 대기 중인 같은 우선순위 텍스트는 한 메시지로 합침
+        size = len(first.kwargs["content"])
+        while lane and lane[0].priority == first.priority and lane[0].text_only:
+            extra = len(lane[0].kwargs["content"]) + 1
+            if size + extra > MESSAGE_LIMIT:
+                break
+            size += extra
+            batch.append(heapq.heappop(lane))
+        return batch
+
+    async def _acquire_global(self, priority: int):
+        entry = (priority, next(self._seq))
+        heapq.heappush(self._global_waiters, entry)
+        async with self._global_cond:
+            try:
+                while True:
+                    if self._global_waiters[0] == entry:
+                        delay = self._global.delay()
+                        if delay <= 0:
+                            self._global.take()
+                            heapq.heappop(self._global_waiters)
+                            return
+                        try:
+                            await asyncio.wait_for(self._global_cond.wait(), delay)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await self._global_cond.wait()
+            except BaseException:
+                if entry in self._global_waiters:
+                    self._global_waiters.remove(entry)
+                    heapq.heapify(self._global_waiters)
+                raise
+            finally:
+                self._global_cond.notify_all()
+
+    async def _deliver(self, batch: list[_Outgoing]):
+        first = batch[0]
+        kwargs = first.kwargs
+        if len(batch) > 1:
+            kwargs = {"content": "\n".join(item.kwargs["content"] for item in batch)}
+            self.stats["coalesced"] += len(batch) - 1
+
+        now = self.clock()
+        for item in batch:
+            latency = now - item.enqueued_at
+            self._latencies.append(latency)
+            self.stats["max_latency"] = max(self.stats["max_latency"], latency)
+            if self.metrics is not None:
+                self.metrics.observe("stage_seconds", latency, stage="send_queue")
+
+        try:
+            if self.metrics is not None:
+                with self.metrics.timer("send"):
+                    result = await first.destination.send(**kwargs)
+            else:
+                result = await first.destination.send(**kwargs)
+        except Exception as e:
+            self.stats["failed"] += 1
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        self.stats["sent"] += 1
+        for item in batch:
+            if not item.future.done():
+                item.future.set_result(result)
+
+    def latency_percentiles(self) -> dict[str, float]:
+        if not self._latencies:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        ordered = sorted(self._latencies)
+        pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+    async def close(self):
+        for worker in list(self._workers.values()):
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+
+
+class FakeMessage:
+    """FakeChannel.send가 돌려주는 메시지. 수정 이력을 남김."""
+
+    def __init__(self, channel, content: str | None = None, embed=None):
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+        self.edits: list[tuple[float, str]] = []
+
+    async def edit(self, content: str | None = None, **kwargs):
+        await asyncio.sleep(self.channel.latency)
+        self.content = content
+        self.edits.append((time.monotonic(), content))
+        return self
+
+
+class FakeChannel:
+    """로컬 테스트용 가짜 Discord 채널. 경로당 레이트 리밋을 넘기면 429처럼 예외를 던짐."""
+
+    def __init__(self, channel_id: int, latency: float = 0.01, limit: int = 5, per: float = 5.0):
+        self.id = channel_id
+        self.latency = latency
+        self.limit = limit
+        self.per = per
+        self.sent: list[tuple[float, dict]] = []
+
+    async def send(self, **kwargs):
+        now = time.monotonic()
+        recent = [t for t, _ in self.sent if now - t < self.per]
+        if len(recent) >= self.limit:
+            raise RuntimeError("429 Too Many Requests")
+        await asyncio.sleep(self.latency)
+        self.sent.append((now, kwargs))
+        return FakeMessage(self, kwargs.get("content"), kwargs.get("embed"))
+
+
+if __name__ == "__main__":
+    # 🔹 가짜 채널로 우선순위 / 합치기 / 레이트 리밋 확인
+    async def _demo():
+        outbound = OutboundScheduler()
+        channels = [FakeChannel(i) for i in range(3)]
+        futures = []
+        for i in range(12):
+            futures.append(outbound.send(channels[0], f"환영 {i}", priority=PRIORITY_WELCOME))
+        futures.append(outbound.send(channels[0], "답변", priority=PRIORITY_REPLY))
+        for channel in channels[1:]:
+            futures += [outbound.send(channel, f"메시지 {i}") for i in range(3)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        print(f"first send on ch0: {channels[0].sent[0][1]['content'][:10]!r}")
+        print(f"stats={outbound.stats} errors={len(errors)} latency={outbound.latency_percentiles()}")
+        await outbound.close()
+
+    asyncio.run(_demo())
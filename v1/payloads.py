@@ -0,0 +1,111 @@
+from discord import Embed
+
+from answer_cache import faq_fingerprint
+
+# 🔹 Discord 제한
+MESSAGE_LIMIT = 2000
+EMBED_TOTAL_LIMIT = 6000
+EMBED_FIELD_LIMIT = 25
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+
+HELP_TITLE = "마롱 사용 가이드"
+HELP_MORE_TITLE = "📄 추가 키워드 안내"
+HELP_DESCRIPTION = "아래 키워드를 입력하면 관련 정보를 알려드려요:"
+HELP_COLOR = 0x6cc644
+
+MEMBER_GUIDE_HEADER = "📖 **마롱 이용 가이드 (FAQ)**"
+
+WELCOME_TEMPLATE = (
+    "👋 {mention}님이 서버에 들어오셨어요!\n"
+    "서비스 이용 중 궁금한 점이 있다면 언제든지 말씀해주세요 🙇‍♂️\n"
+    "`!문의` 라고 입력하시면 마롱이 챗봇과 1:1 문의 채널이 생성돼요!\n"
+    "`!문의-운영진` 라고 입력하시면 운영진과 비밀 문의 채널이 생성돼요!"
+)
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 4] + "..."
+
+
+def help_embed_specs(faq_2: dict) -> list[dict]:
+    # 🔸 필드 25개 / 임베드 전체 6000자 중 먼저 닿는 쪽에서 다음 임베드로 넘김
+    specs: list[dict] = []
+    current = None
+    size = 0
+    for key, value in faq_2.items():
+        field = {"name": _truncate(key, FIELD_NAME_LIMIT), "value": _truncate(value, FIELD_VALUE_LIMIT), "inline": False}
+        field_size = len(field["name"]) + len(field["value"])
+        if current is None or len(current["fields"]) >= EMBED_FIELD_LIMIT or size + field_size > EMBED_TOTAL_LIMIT:
+            title = HELP_TITLE if not specs else HELP_MORE_TITLE
+            current = {"title": title, "description": HELP_DESCRIPTION, "color": HELP_COLOR, "fields": []}
+            specs.append(current)
+            size = len(title) + len(HELP_DESCRIPTION)
+        current["fields"].append(field)
+        size += field_size
+    return specs
+
+
+def split_message(blocks: list[str], separator: str = "\n\n", limit: int = MESSAGE_LIMIT) -> list[str]:
+    # 🔸 블록 단위로 2000자 이하 메시지로 나눔 (블록 하나가 넘치면 강제로 자름)
+    messages: list[str] = []
+    current = ""
+    for block in blocks:
+        while len(block) > limit:
+            if current:
+                messages.append(current)
+                current = ""
+            messages.append(block[:limit])
+            block = block[limit:]
+        candidate = f"{current}{separator}{block}" if current else block
+        if len(candidate) > limit:
+            messages.append(current)
+            current = block
+        else:
+            current = candidate
+    if current:
+        messages.append(current)
+    return messages
+
+
+class CompiledPayloads:
+    """콘텐츠 버전 하나에 대해 미리 만들어 둔 응답 묶음. 만든 뒤에는 바꾸지 않음."""
+
+    __slots__ = ("version", "help_embeds", "member_guide")
+
+    def __init__(self, faq: dict, faq_2: dict):
+        self.version = faq_fingerprint({"faq": faq, "faq_2": faq_2})
+        self.help_embeds = tuple(Embed.from_dict(spec) for spec in help_embed_specs(faq_2))
+        self.member_guide = tuple(split_message(
+            [MEMBER_GUIDE_HEADER] + [f"**{key}**: {value}" for key, value in faq.items()]
+        ))
+
+    @staticmethod
+    def welcome_batch(mentions: list[str]) -> list[str]:
+        # 🔹 여러 명을 멘션 하나의 환영 메시지로 묶음 (2000자를 넘으면 멘션 단위로 나눔)
+        room = MESSAGE_LIMIT - len(WELCOME_TEMPLATE.format(mention=""))
+        return [WELCOME_TEMPLATE.format(mention=group) for group in split_message(mentions, separator=" ", limit=room)]
+
+
+class PayloadCache:
+    """콘텐츠가 바뀌었을 때만 CompiledPayloads를 새로 만듦."""
+
+    def __init__(self, faq: dict, faq_2: dict):
+        self.current = CompiledPayloads(faq, faq_2)
+        self.stats = {"compiles": 1}
+
+    def compile(self, faq: dict, faq_2: dict) -> CompiledPayloads:
+        # 🔹 새 버전이면 만들기만 함 (워커 스레드에서 호출 가능). 교체는 install()
+        version = faq_fingerprint({"faq": faq, "faq_2": faq_2})
+        if version == self.current.version:
+            return self.current
+        return CompiledPayloads(faq, faq_2)
+
+    def install(self, compiled: CompiledPayloads):
+        if compiled is not self.current:
+            self.current = compiled
+            self.stats["compiles"] += 1
+
+    def update(self, faq: dict, faq_2: dict) -> CompiledPayloads:
+        self.install(self.compile(faq, faq_2))
+        return self.current
@@ -0,0 +1,95 @@
+import math, re
+
+import numpy as np
+
+from faq_matcher import PARTICLES, strip_particle
+
+_TOKEN_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_DIGIT_RE = re.compile(r"\d+")
+
+# 🔹 질문마다 흔히 붙어서 변별력이 없는 말
+STOPWORDS = {
+    "뭐", "뭐야", "뭔가", "뭘", "어떻게", "언제", "어디", "어디서", "어디에", "왜", "좀", "너무", "꼭",
+    "돼", "되나", "되나요", "돼요", "해", "해요", "해줘", "알려줘", "있어", "있나요", "하는", "거야", "수",
+}
+
+
+def features(text: str) -> dict[str, float]:
+    # 🔹 조사 뗀 단어 + 음절 바이그램 (띄어쓰기 / 어미 변형에 덜 민감하게)
+    tokens = [strip_particle(token) for token in _TOKEN_RE.sub(" ", text.lower()).split()]
+    tokens = [_DIGIT_RE.sub("0", token) for token in tokens if token not in PARTICLES and token not in STOPWORDS]
+    counts: dict[str, float] = {}
+    for token in tokens:
+        counts[f"w:{token}"] = counts.get(f"w:{token}", 0.0) + 1.0
+        for i in range(len(token) - 1):
+            gram = f"b:{token[i:i + 2]}"
+            counts[gram] = counts.get(gram, 0.0) + 1.0
+    return counts
+
+
+class SemanticRetriever:
+    """FAQ 키+답변의 TF-IDF 행렬. 질의 하나를 행렬 곱 한 번으로 점수화 (네트워크 불필요)."""
+
+    def __init__(self, faq: dict, key_weight: float = 3.0, threshold: float = 0.3, margin: float = 0.05):
+        self.keys = list(faq.keys())
+        self.answers = [faq[key] for key in self.keys]
+        self.threshold = threshold
+        self.margin = margin
+
+        docs = []
+        for key, value in faq.items():
+            doc = features(value)
+            for term, count in features(key).items():
+                doc[term] = doc.get(term, 0.0) + key_weight * count
+            docs.append(doc)
+
+        vocab: dict[str, int] = {}
+        df: dict[str, int] = {}
+        for doc in docs:
+            for term in doc:
+                vocab.setdefault(term, len(vocab))
+                df[term] = df.get(term, 0) + 1
+
+        n_docs = len(docs)
+        self.vocab = vocab
+        self.idf = np.zeros(len(vocab), dtype=np.float32)
+        for term, idx in vocab.items():
+            self.idf[idx] = math.log((1 + n_docs) / (1 + df[term])) + 1.0
+
+        # 🔹 (어휘 × 문서) 행렬을 미리 L2 정규화해 두고 질의 때는 곱하기만 함
+        matrix = np.zeros((len(vocab), n_docs), dtype=np.float32)
+        for col, doc in enumerate(docs):
+            for term, count in doc.items():
+                matrix[vocab[term], col] = (1.0 + math.log(count)) * self.idf[vocab[term]]
+        norms = np.linalg.norm(matrix, axis=0)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+    def scores(self, text: str) -> np.ndarray:
+        query = features(text)
+        idx = [self.vocab[term] for term in query if term in self.vocab]
+        if not idx:
+            return np.zeros(len(self.keys), dtype=np.float32)
+        weights = np.array([(1.0 + math.log(query[term])) for term in query if term in self.vocab], dtype=np.float32)
+        weights *= self.idf[idx]
+        norm = float(np.linalg.norm(weights)) or 1.0
+        return (weights / norm) @ self.matrix[idx]
+
+    def search(self, text: str, k: int = 3) -> list[tuple[str, float]]:
+        scores = self.scores(text)
+        top = np.argsort(-scores)[:k]
+        return [(self.keys[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def best(self, text: str) -> str | None:
+        # 🔸 점수가 기준 이상이고, 답이 다른 차순위와 충분히 차이 날 때만 확신
+        scores = self.scores(text)
+        order = np.argsort(-scores)
+        top = int(order[0]) if len(order) else None
+        if top is None or scores[top] < self.threshold:
+            return None
+        for other in order[1:]:
+            if self.answers[other] != self.answers[top]:
+                if scores[top] - scores[other] < self.margin:
+                    return None
+                break
+        return self.keys[top]
@@ -0,0 +1,147 @@
+import json, os, sqlite3, time
+
+
+class InProcessBackend:
+    """프로세스 안 dict / set. 프로세스 하나로 돌릴 때 기본값."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._sets: dict[str, set] = {}
+        self._values: dict[tuple[str, object], tuple[object, float | None]] = {}
+
+    def sadd(self, name: str, member):
+        self._sets.setdefault(name, set()).add(member)
+
+    def srem(self, name: str, member):
+        self._sets.get(name, set()).discard(member)
+
+    def sismember(self, name: str, member) -> bool:
+        return member in self._sets.get(name, ())
+
+    def smembers(self, name: str) -> set:
+        return set(self._sets.get(name, ()))
+
+    def get(self, name: str, key, default=None):
+        entry = self._values.get((name, key))
+        if entry is None:
+            return default
+        value, expires = entry
+        if expires is not None and expires <= self.clock():
+            del self._values[(name, key)]
+            return default
+        return value
+
+    def put(self, name: str, key, value, ttl: float | None = None):
+        self._values[(name, key)] = (value, self.clock() + ttl if ttl else None)
+
+    def delete(self, name: str, key):
+        self._values.pop((name, key), None)
+
+    def close(self):
+        pass
+
+
+class LocalStoreBackend:
+    """같은 머신의 여러 프로세스가 함께 쓰는 SQLite(WAL) 저장소. 값은 JSON으로 저장."""
+
+    def __init__(self, path: str = "./data/state.sqlite3", clock=time.time):
+        self.clock = clock
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 🔸 autocommit + WAL: 읽기는 다른 프로세스의 쓰기를 기다리지 않음
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS state_sets ("
+            " name TEXT NOT NULL, member TEXT NOT NULL, PRIMARY KEY (name, member)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS state_values ("
+            " name TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires REAL,"
+            " PRIMARY KEY (name, key)) WITHOUT ROWID"
+        )
+
+    @staticmethod
+    def _encode(value) -> str:
+        return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+    def sadd(self, name: str, member):
+        self._db.execute("INSERT OR IGNORE INTO state_sets VALUES (?, ?)", (name, self._encode(member)))
+
+    def srem(self, name: str, member):
+        self._db.execute("DELETE FROM state_sets WHERE name = ? AND member = ?", (name, self._encode(member)))
+
+    def sismember(self, name: str, member) -> bool:
+        row = self._db.execute(
+            "SELECT 1 FROM state_sets WHERE name = ? AND member = ?", (name, self._encode(member))
+        ).fetchone()
+        return row is not None
+
+    def smembers(self, name: str) -> set:
+        rows = self._db.execute("SELECT member FROM state_sets WHERE name = ?", (name,))
+        return {json.loads(member) for (member,) in rows}
+
+    def get(self, name: str, key, default=None):
+        row = self._db.execute(
+            "SELECT value, expires FROM state_values WHERE name = ? AND key = ?", (name, self._encode(key))
+        ).fetchone()
+        if row is None:
+            return default
+        if row[1] is not None and row[1] <= self.clock():
+            self.delete(name, key)
+            return default
+        return json.loads(row[0])
+
+    def put(self, name: str, key, value, ttl: float | None = None):
+        self._db.execute(
+            "INSERT OR REPLACE INTO state_values VALUES (?, ?, ?, ?)",
+            (name, self._encode(key), self._encode(value), self.clock() + ttl if ttl else None),
+        )
+
+    def delete(self, name: str, key):
+        self._db.execute("DELETE FROM state_values WHERE name = ? AND key = ?", (name, self._encode(key)))
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class SharedSet:
+    """백엔드 위의 set. 기존 set처럼 add / discard / in 으로 사용."""
+
+    __slots__ = ("backend", "name")
+
+    def __init__(self, backend, name: str, initial=()):
+        self.backend = backend
+        self.name = name
+        self.update(initial)
+
+    def add(self, member):
+        self.backend.sadd(self.name, member)
+
+    def update(self, members):
+        for member in members:
+            self.backend.sadd(self.name, member)
+
+    def discard(self, member):
+        self.backend.srem(self.name, member)
+
+    def __contains__(self, member) -> bool:
+        return self.backend.sismember(self.name, member)
+
+    def __iter__(self):
+        return iter(self.backend.smembers(self.name))
+
+    def __len__(self) -> int:
+        return len(self.backend.smembers(self.name))
+
+
+def make_backend(kind: str = "memory", path: str = "./data/state.sqlite3"):
+    if kind == "memory":
+        return InProcessBackend()
+    if kind == "local":
+        return LocalStoreBackend(path)
+    raise ValueError(f"알 수 없는 STATE_BACKEND: {kind!r} (memory / local)")
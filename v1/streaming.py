@@ -0,0 +1,111 @@
+import time
+from collections import deque
+
+MESSAGE_LIMIT = 2000
+PLACEHOLDER = "💭 답변을 작성하고 있어요..."
+EMPTY_REPLY = "죄송해요, 답변을 만들지 못했어요 😢"
+
+
+def split_point(text: str, limit: int = MESSAGE_LIMIT) -> int:
+    # 🔹 가능하면 줄바꿈 / 띄어쓰기에서 자름
+    if len(text) <= limit:
+        return len(text)
+    for sep in ("\n", " "):
+        cut = text.rfind(sep, limit // 2, limit)
+        if cut > 0:
+            return cut + 1
+    return limit
+
+
+class StreamMetrics:
+    """스트리밍 응답 지표. 첫 내용이 보이기까지 걸린 시간(TTFB)이 핵심."""
+
+    def __init__(self, maxlen: int = 512):
+        self.ttfb: deque[float] = deque(maxlen=maxlen)
+        self.placeholder: deque[float] = deque(maxlen=maxlen)
+        self.total: deque[float] = deque(maxlen=maxlen)
+        self.stats = {"streams": 0, "edits": 0, "followups": 0, "errors": 0}
+
+    @staticmethod
+    def _percentiles(samples) -> dict[str, float]:
+        if not samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        ordered = sorted(samples)
+        pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+    def snapshot(self) -> dict:
+        return dict(
+            self.stats,
+            ttfb=self._percentiles(self.ttfb),
+            placeholder=self._percentiles(self.placeholder),
+            total=self._percentiles(self.total),
+        )
+
+
+class _StreamedReply:
+    def __init__(self, send, metrics: StreamMetrics, limit: int):
+        self.send = send
+        self.metrics = metrics
+        self.limit = limit
+        self.message = None
+        self.shown = ""
+        self.text = ""
+        self.segment_start = 0
+        self.started = time.monotonic()
+        self.first_visible = None
+
+    async def edit(self, content: str):
+        await self.message.edit(content=content)
+        self.shown = content
+        self.metrics.stats["edits"] += 1
+        if self.first_visible is None:
+            self.first_visible = time.monotonic()
+            self.metrics.ttfb.append(self.first_visible - self.started)
+
+    async def flush(self):
+        # 🔸 2000자를 넘으면 현재 메시지를 확정하고 이어지는 메시지를 새로 보냄
+        while len(self.text) - self.segment_start > self.limit:
+            cut = self.segment_start + split_point(self.text[self.segment_start:], self.limit)
+            await self.edit(self.text[self.segment_start:cut])
+            self.segment_start = cut
+            self.message = await self.send(self.text[cut:cut + self.limit])
+            self.shown = self.text[cut:cut + self.limit]
+            self.metrics.stats["followups"] += 1
+        current = self.text[self.segment_start:]
+        if current and current != self.shown:
+            await self.edit(current)
+
+
+async def stream_reply(send, chunks, edit_interval: float = 1.2, metrics: StreamMetrics | None = None,
+                       format_error=lambda e: f"❌ Gemini 오류 발생: {e}", limit: int = MESSAGE_LIMIT,
+                       empty_text: str = EMPTY_REPLY):
+    """자리표시 메시지를 먼저 보내고, 조각이 오는 대로 묶어서 수정. (전체 텍스트, 오류) 반환."""
+    metrics = metrics or StreamMetrics()
+    reply = _StreamedReply(send, metrics, limit)
+    metrics.stats["streams"] += 1
+
+    reply.message = await send(PLACEHOLDER)
+    reply.shown = PLACEHOLDER
+    metrics.placeholder.append(time.monotonic() - reply.started)
+
+    error = None
+    last_edit = 0.0
+    try:
+        async for chunk in chunks:
+            reply.text += chunk
+            # 🔹 Discord 수정 한도를 넘지 않도록 edit_interval마다 한 번만 수정
+            if time.monotonic() - last_edit >= edit_interval:
+                await reply.flush()
+                last_edit = time.monotonic()
+    except Exception as e:
+        error = e
+        metrics.stats["errors"] += 1
+        reply.text = f"{reply.text}\n{format_error(e)}" if reply.text else format_error(e)
+
+    await reply.flush()
+    if not reply.text:
+        # 🔸 조각 없이 끝났으면 자리표시가 그대로 남지 않도록 안내 문구로 바꿈 (반환 텍스트는 빈 문자열)
+        await reply.edit(empty_text)
+    metrics.total.append(time.monotonic() - reply.started)
+    return reply.text, error
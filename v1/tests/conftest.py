@@ -0,0 +1,24 @@
+import os, sys
+
+import pytest
+
+# 🔹 v1 모듈은 패키지가 아니라 같은 폴더에서 바로 import하는 구조
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """테스트에서 직접 시간을 넘기는 시계."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
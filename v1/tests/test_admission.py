@@ -0,0 +1,46 @@
+from admission import AdmissionController
+
+
+def make(clock, **overrides):
+    limits = dict(user_rate=1.0, user_burst=2, channel_rate=10.0, channel_burst=10, global_rate=100.0, global_burst=100)
+    limits.update(overrides)
+    return AdmissionController(clock=clock, sweep_interval=60.0, idle_ttl=60.0, **limits)
+
+
+def test_allowed_call_returns_none_and_spends_tokens(clock):
+    admission = make(clock)
+    assert admission.reject_reason(1, 10) is None
+    assert admission.reject_reason(1, 10) is None
+    assert admission.reject_reason(1, 10) == "user"
+    assert admission.stats["admitted"] == 2
+    assert admission.stats["rejected_user"] == 1
+
+
+def test_user_bucket_refills_over_time(clock):
+    admission = make(clock)
+    admission.reject_reason(1, 10)
+    admission.reject_reason(1, 10)
+    clock.advance(1.0)
+    assert admission.reject_reason(1, 10) is None
+
+
+def test_rejection_does_not_spend_other_scopes(clock):
+    admission = make(clock, channel_burst=1, channel_rate=0.01)
+    assert admission.reject_reason(1, 10) is None
+    assert admission.reject_reason(2, 10) == "channel"
+    # 🔸 채널에서 막힌 사용자 2의 토큰은 그대로 남아 있음
+    assert admission.reject_reason(2, 11) is None
+    assert admission.reject_reason(2, 12) is None
+    assert admission.reject_reason(2, 13) == "user"
+
+
+def test_idle_buckets_are_swept(clock):
+    admission = make(clock)
+    for user_id in range(5):
+        admission.reject_reason(user_id, user_id)
+    assert admission.snapshot()["users"] == 5
+    clock.advance(61.0)
+    admission.reject_reason(99, 99)
+    snapshot = admission.snapshot()
+    assert snapshot["users"] == 1
+    assert snapshot["evicted"] >= 10
@@ -0,0 +1,63 @@
+from answer_cache import AnswerCache
+
+FAQ = {"매칭": "매주 월요일에 매칭돼요."}
+
+
+def make_cache(tmp_path, clock, **kwargs):
+    cache = AnswerCache(ttl=100.0, db_path=str(tmp_path / "answers.sqlite3"), clock=clock, **kwargs)
+    cache.bind(FAQ)
+    return cache
+
+
+def disk_rows(cache) -> list[str]:
+    return [question for (question,) in cache._db.execute("SELECT question FROM answers ORDER BY created_at")]
+
+
+def test_get_normalizes_and_expires(tmp_path, clock):
+    cache = make_cache(tmp_path, clock)
+    cache.put("환불  규정이 뭐야?", "답변")
+    assert cache.get("환불 규정이 뭐야?") == "답변"
+    clock.advance(101)
+    assert cache.get("환불 규정이 뭐야?") is None
+
+
+def test_faq_change_invalidates_answers(tmp_path, clock):
+    cache = make_cache(tmp_path, clock)
+    cache.put("질문", "답변")
+    cache.bind({**FAQ, "새 항목": "새 답변"})
+    assert cache.get("질문") is None
+    assert disk_rows(cache) == []
+
+
+def test_answers_survive_restart(tmp_path, clock):
+    cache = make_cache(tmp_path, clock)
+    cache.put("질문", "답변")
+    cache.close()
+    reopened = make_cache(tmp_path, clock)
+    assert reopened.get("질문") == "답변"
+    assert reopened.stats["disk_hits"] == 1
+
+
+def test_purge_drops_expired_and_caps_rows(tmp_path, clock):
+    cache = make_cache(tmp_path, clock, max_rows=3, purge_every=1000)
+    for i in range(6):
+        clock.advance(1)
+        cache.put(f"질문 {i}", "답변")
+    assert len(disk_rows(cache)) == 6
+
+    assert cache.purge() == 3
+    assert disk_rows(cache) == ["질문 3", "질문 4", "질문 5"]
+
+    clock.advance(101)
+    cache.put("새 질문", "답변")
+    cache.purge()
+    assert disk_rows(cache) == ["새 질문"]
+
+
+def test_put_purges_periodically(tmp_path, clock):
+    cache = make_cache(tmp_path, clock, max_rows=2, purge_every=5)
+    for i in range(5):
+        clock.advance(1)
+        cache.put(f"질문 {i}", "답변")
+    assert len(disk_rows(cache)) == 2
+    assert cache.stats["purged"] == 3
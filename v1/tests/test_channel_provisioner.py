@@ -0,0 +1,255 @@
+import asyncio
+
+from channel_provisioner import SPARE_KIND, ChannelProvisioner
+
+
+class FakeRegistry:
+    """ChannelRegistry 중 provisioner가 쓰는 부분만. (주인, 종류, 길드) -> 채널 id."""
+
+    def __init__(self):
+        self.by_owner: dict[tuple, int] = {}
+        self.kinds: dict[int, str] = {}
+
+    def channel_of(self, owner_id, kind="bot", guild_id=None):
+        return self.by_owner.get((owner_id, kind, guild_id))
+
+    def register(self, channel_id, owner_id, kind="bot", guild_id=None):
+        self.by_owner[(owner_id, kind, guild_id)] = channel_id
+        self.kinds[channel_id] = kind
+
+    def unregister(self, channel_id):
+        self.kinds.pop(channel_id, None)
+        for key, value in list(self.by_owner.items()):
+            if value == channel_id:
+                del self.by_owner[key]
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild, fail_delete: bool = False):
+        self.id = channel_id
+        self.guild = guild
+        self.name = f"대기-{channel_id}"
+        self.fail_delete = fail_delete
+        self.deleted = False
+
+    async def delete(self):
+        if self.fail_delete:
+            raise RuntimeError("403 Forbidden")
+        self.deleted = True
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+class Harness:
+    def __init__(self, pool_size: int = 0, create_delay: float = 0.02, fail_claim: bool = False):
+        self.registry = FakeRegistry()
+        self.channels: dict[int, FakeChannel] = {}
+        self.created = 0
+        self.claimed = 0
+        self.create_delay = create_delay
+        self.fail_claim = fail_claim
+        self.guild = FakeGuild(1)
+        self.provisioner = ChannelProvisioner(
+            self.registry, self.channels.get, self.create, self.claim, self.create_spare, lambda: self.guild,
+            pool_size=pool_size, refill_interval=0.0, error_backoff=0.0,
+        )
+
+    def new_channel(self, guild, **kwargs) -> FakeChannel:
+        channel = FakeChannel(100 + len(self.channels), guild, **kwargs)
+        self.channels[channel.id] = channel
+        return channel
+
+    async def create(self, guild, owner, kind):
+        self.created += 1
+        await asyncio.sleep(self.create_delay)
+        return self.new_channel(guild)
+
+    async def create_spare(self, guild):
+        return await self.create(guild, None, SPARE_KIND)
+
+    async def claim(self, spare, guild, owner, kind):
+        self.claimed += 1
+        if self.fail_claim:
+            raise RuntimeError("50013 Missing Permissions")
+        spare.name = f"문의-{owner.id}"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_requests_from_one_user_share_one_channel():
+    async def scenario():
+        h = Harness()
+        results = await asyncio.gather(*(h.provisioner.provision(h.guild, FakeUser(7)) for _ in range(5)))
+        return h, results
+
+    h, results = run(scenario())
+    assert h.created == 1
+    assert len({channel.id for channel, _ in results}) == 1
+    assert [created for _, created in results].count(True) == 1
+    assert h.provisioner.stats["coalesced"] == 4
+
+
+def test_existing_channel_is_returned_without_creating():
+    async def scenario():
+        h = Harness()
+        first, created = await h.provisioner.provision(h.guild, FakeUser(7))
+        again, created_again = await h.provisioner.provision(h.guild, FakeUser(7))
+        return h, first, created, again, created_again
+
+    h, first, created, again, created_again = run(scenario())
+    assert created and not created_again
+    assert again is first
+    assert h.created == 1 and h.provisioner.stats["existing"] == 1
+
+
+def test_kinds_are_separate_per_user():
+    async def scenario():
+        h = Harness()
+        bot, _ = await h.provisioner.provision(h.guild, FakeUser(7), "bot")
+        admin, _ = await h.provisioner.provision(h.guild, FakeUser(7), "admin")
+        return bot, admin
+
+    bot, admin = run(scenario())
+    assert bot is not admin
+
+
+def test_same_user_gets_a_channel_per_guild():
+    async def scenario():
+        h = Harness()
+        other = FakeGuild(2)
+        first, _ = await h.provisioner.provision(h.guild, FakeUser(7))
+        second, created = await h.provisioner.provision(other, FakeUser(7))
+        return first, second, created, other
+
+    first, second, created, other = run(scenario())
+    assert created
+    assert first.guild.id == 1 and second.guild is other
+
+
+def test_failure_reaches_every_waiter_and_allows_retry():
+    async def scenario():
+        h = Harness()
+
+        async def broken(guild, owner, kind):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("429 Too Many Requests")
+
+        h.provisioner.create = broken
+        results = await asyncio.gather(*(h.provisioner.provision(h.guild, FakeUser(7)) for _ in range(3)),
+                                       return_exceptions=True)
+        h.provisioner.create = h.create
+        channel, created = await h.provisioner.provision(h.guild, FakeUser(7))
+        return h, results, created
+
+    h, results, created = run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert h.provisioner.stats["errors"] == 1
+    assert created
+
+
+def test_spare_from_pool_is_claimed():
+    async def scenario():
+        h = Harness()
+        spare = h.new_channel(h.guild)
+        h.provisioner.add_spare(spare)
+        channel, created = await h.provisioner.provision(h.guild, FakeUser(7))
+        return h, spare, channel, created
+
+    h, spare, channel, created = run(scenario())
+    assert channel is spare and created
+    assert h.created == 0 and h.claimed == 1
+    assert h.registry.kinds == {spare.id: "bot"}
+    assert h.provisioner.spares == 0
+
+
+def test_add_spare_is_idempotent():
+    h = Harness()
+    spare = h.new_channel(h.guild)
+    h.provisioner.add_spare(spare)
+    h.provisioner.add_spare(spare)  # 재연결로 on_ready가 다시 불려도 한 번만
+    assert h.provisioner.spares == 1
+
+    async def scenario():
+        return await asyncio.gather(h.provisioner.provision(h.guild, FakeUser(1)),
+                                    h.provisioner.provision(h.guild, FakeUser(2)))
+
+    (first, _), (second, _) = run(scenario())
+    assert first is not second
+
+
+def test_spares_from_other_guilds_are_not_handed_out():
+    async def scenario():
+        h = Harness()
+        h.provisioner.add_spare(h.new_channel(FakeGuild(2)))
+        channel, _ = await h.provisioner.provision(h.guild, FakeUser(7))
+        return h, channel
+
+    h, channel = run(scenario())
+    assert channel.guild is h.guild
+    assert h.claimed == 0 and h.created == 1
+    assert h.provisioner.spares == 1
+
+
+def test_failed_claim_deletes_the_spare():
+    async def scenario():
+        h = Harness(fail_claim=True)
+        spare = h.new_channel(h.guild)
+        h.provisioner.add_spare(spare)
+        channel, _ = await h.provisioner.provision(h.guild, FakeUser(7))
+        return h, spare, channel
+
+    h, spare, channel = run(scenario())
+    assert spare.deleted
+    assert channel is not spare
+    assert spare.id not in h.registry.kinds
+    assert h.provisioner.stats["claim_failures"] == 1
+
+
+def test_failed_claim_keeps_undeletable_spare_registered():
+    async def scenario():
+        h = Harness(fail_claim=True)
+        spare = h.new_channel(h.guild, fail_delete=True)
+        h.provisioner.add_spare(spare)
+        await h.provisioner.provision(h.guild, FakeUser(7))
+        return h, spare
+
+    h, spare = run(scenario())
+    assert h.registry.kinds[spare.id] == SPARE_KIND  # 🔸 재시작 때 다시 복원해서 정리
+    assert h.provisioner.spares == 0
+
+
+def test_pool_refills_to_size():
+    async def scenario():
+        h = Harness(pool_size=2, create_delay=0.0)
+        h.provisioner.start()
+        for _ in range(50):
+            if h.provisioner.spares_in(h.guild) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await h.provisioner.provision(h.guild, FakeUser(7))
+        for _ in range(50):
+            if h.provisioner.spares_in(h.guild) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await h.provisioner.close()
+        return h
+
+    h = run(scenario())
+    assert h.provisioner.spares_in(h.guild) == 2
+    assert h.provisioner.stats["from_pool"] == 1
+    assert h.provisioner.stats["spares_created"] == 3
+
+
+def test_pool_needs_claim_and_create_spare():
+    provisioner = ChannelProvisioner(FakeRegistry(), lambda _: None, create=None, pool_size=3)
+    assert provisioner.pool_size == 0
@@ -0,0 +1,80 @@
+import sqlite3
+
+from channel_registry import ChannelRegistry
+
+
+def make_registry(path, clock):
+    registry = ChannelRegistry(db_path=str(path), clock=clock)
+    registry.load()
+    return registry
+
+
+def test_owner_lookup_is_per_guild(clock):
+    registry = ChannelRegistry(db_path=None, clock=clock)
+    registry.register(10, 7, "bot", guild_id=1)
+    registry.register(20, 7, "bot", guild_id=2)
+    assert registry.channel_of(7, "bot", 1) == 10
+    assert registry.channel_of(7, "bot", 2) == 20
+    assert registry.channel_of(7, "admin", 1) is None
+
+
+def test_re_register_in_same_guild_replaces_previous(clock):
+    registry = ChannelRegistry(db_path=None, clock=clock)
+    registry.register(10, 7, "bot", guild_id=1)
+    registry.register(11, 7, "bot", guild_id=1)
+    assert registry.channel_of(7, "bot", 1) == 11
+    assert 10 not in registry
+
+
+def test_processes_sharing_a_file_keep_each_others_rows(tmp_path, clock):
+    # 🔸 다른 길드를 맡은 두 샤드 프로세스가 같은 사용자의 문의 채널을 각각 등록
+    path = tmp_path / "channels.sqlite3"
+    first, second = make_registry(path, clock), make_registry(path, clock)
+    first.register(10, 7, "bot", guild_id=1)
+    second.register(20, 7, "bot", guild_id=2)
+
+    restarted = make_registry(path, clock)
+    assert {(r.channel_id, r.guild_id) for r in restarted.records()} == {(10, 1), (20, 2)}
+
+
+def test_forget_keeps_row_unregister_deletes(tmp_path, clock):
+    path = tmp_path / "channels.sqlite3"
+    registry = make_registry(path, clock)
+    registry.register(10, 7, "bot", guild_id=1)
+    registry.register(20, 8, "bot", guild_id=2)
+    registry.forget(10)
+    registry.unregister(20)
+    assert len(registry) == 0
+    assert [r.channel_id for r in make_registry(path, clock).records()] == [10]
+
+
+def test_touch_is_flushed_and_survives_restart(tmp_path, clock):
+    path = tmp_path / "channels.sqlite3"
+    registry = make_registry(path, clock)
+    registry.register(10, 7, "bot", guild_id=1)
+    clock.advance(50)
+    assert registry.touch(10)
+    assert not registry.touch(99)
+    registry.flush()
+    assert make_registry(path, clock).get(10).last_active == clock.now
+
+
+def test_legacy_rows_get_guild_column_and_backfill(tmp_path, clock):
+    path = tmp_path / "channels.sqlite3"
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE inquiry_channels (channel_id INTEGER PRIMARY KEY, owner_id INTEGER NOT NULL,"
+               " kind TEXT NOT NULL, last_active REAL NOT NULL)")
+    db.execute("CREATE UNIQUE INDEX idx_owner_kind ON inquiry_channels (owner_id, kind)")
+    db.execute("INSERT INTO inquiry_channels VALUES (10, 7, 'bot', 500.0)")
+    db.commit()
+    db.close()
+
+    registry = make_registry(path, clock)
+    assert registry.get(10).guild_id is None
+    registry.assign_guild(10, 1)
+    assert registry.channel_of(7, "bot", 1) == 10
+    assert registry.channel_of(7, "bot") is None
+    registry.register(20, 7, "bot", guild_id=2)  # 예전 (주인, 종류) 고유 인덱스가 남아 있으면 10이 지워짐
+
+    restarted = make_registry(path, clock)
+    assert {(r.channel_id, r.guild_id, r.last_active) for r in restarted.records()} == {(10, 1, 500.0), (20, 2, clock.now)}
@@ -0,0 +1,167 @@
+import asyncio
+
+from expiry_scheduler import ExpiryScheduler
+
+
+async def _noop(channel_id, idle):
+    pass
+
+
+def make_scheduler(clock, on_expire=_noop, **kwargs):
+    return ExpiryScheduler(on_expire, default_idle=100.0, clock=clock, **kwargs)
+
+
+def test_expires_in_deadline_order(clock):
+    scheduler = make_scheduler(clock)
+    scheduler.schedule(1, clock.now + 30)
+    scheduler.schedule(2, clock.now)
+    scheduler.schedule(3, clock.now + 10)
+
+    clock.advance(99)
+    assert scheduler.pop_due() == []
+    assert scheduler.next_delay() == 1.0
+
+    clock.advance(200)
+    assert scheduler.pop_due() == [2, 3, 1]
+    assert len(scheduler) == 0
+    assert scheduler.next_delay() is None
+
+
+def test_only_due_channels_are_popped(clock):
+    scheduler = make_scheduler(clock)
+    scheduler.schedule(1, clock.now)
+    scheduler.schedule(2, clock.now + 50)
+
+    clock.advance(100)
+    assert scheduler.pop_due() == [1]
+    assert scheduler.deadline(2) == clock.now + 50
+    clock.advance(50)
+    assert scheduler.pop_due() == [2]
+
+
+def test_bump_defers_expiry_with_lazy_repush(clock):
+    scheduler = make_scheduler(clock)
+    scheduler.schedule(1, clock.now)
+
+    clock.advance(90)
+    scheduler.bump(1, clock.now)
+    assert len(scheduler._heap) == 1  # 힙은 그대로, 마감 시각만 바뀜
+
+    clock.advance(10)  # 원래 마감 시각
+    assert scheduler.pop_due() == []
+    assert scheduler.stats["stale_pops"] == 1
+    assert scheduler._heap == [(clock.now + 90, 1)]
+
+    clock.advance(90)
+    assert scheduler.pop_due() == [1]
+
+
+def test_bump_and_cancel_ignore_unknown_or_removed_channels(clock):
+    scheduler = make_scheduler(clock)
+    scheduler.bump(42, clock.now)
+    assert scheduler.deadline(42) is None
+
+    scheduler.schedule(1, clock.now)
+    scheduler.cancel(1)
+    clock.advance(100)
+    assert scheduler.pop_due() == []
+    assert scheduler.stats["stale_pops"] == 1
+
+
+def test_earlier_reschedule_wins(clock):
+    scheduler = make_scheduler(clock)
+    scheduler.schedule(1, clock.now + 50)
+    scheduler.schedule(1, clock.now)
+    clock.advance(100)
+    assert scheduler.pop_due() == [1]
+    clock.advance(100)
+    assert scheduler.pop_due() == []
+
+
+def test_per_channel_idle_policies(clock):
+    expired = []
+
+    async def on_expire(channel_id, idle):
+        expired.append((channel_id, idle))
+
+    scheduler = make_scheduler(clock, on_expire)
+    scheduler.schedule(1, clock.now)  # 기본 100초
+    scheduler.schedule(2, clock.now, idle=300.0)
+    scheduler.schedule(3, clock.now, idle=10.0)
+
+    clock.advance(10)
+    scheduler.bump(2, clock.now)  # 채널 정책(300초) 기준으로 늦춰짐
+    assert scheduler.deadline(2) == clock.now + 300
+
+    asyncio.run(scheduler.run_due())
+    clock.advance(90)
+    asyncio.run(scheduler.run_due())
+    assert expired == [(3, 10.0), (1, 100.0)]
+
+    clock.advance(220)
+    asyncio.run(scheduler.run_due())
+    assert expired[-1] == (2, 300.0)
+    assert scheduler.stats["expired"] == 3
+
+
+def test_run_due_respects_concurrency_cap(clock):
+    running = 0
+    peak = 0
+
+    async def on_expire(channel_id, idle):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def scenario():
+        scheduler = make_scheduler(clock, on_expire, max_concurrent=2)
+        for channel_id in range(7):
+            scheduler.schedule(channel_id, clock.now)
+        clock.advance(100)
+        await scheduler.run_due()
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert peak == 2
+    assert scheduler.stats["expired"] == 7
+    assert len(scheduler) == 0
+
+
+def test_failed_expiry_is_counted_and_does_not_block_others(clock):
+    done = []
+
+    async def on_expire(channel_id, idle):
+        if channel_id == 1:
+            raise RuntimeError("403 Forbidden")
+        done.append(channel_id)
+
+    scheduler = make_scheduler(clock, on_expire)
+    scheduler.schedule(1, clock.now)
+    scheduler.schedule(2, clock.now)
+    clock.advance(100)
+    asyncio.run(scheduler.run_due())
+    assert done == [2]
+    assert scheduler.stats == {"expired": 1, "failed": 1, "stale_pops": 0}
+
+
+def test_background_task_wakes_for_earlier_deadline():
+    # 🔸 실제 대기는 next_delay()만큼이므로 시계와 마감 시각을 현재 근처로 맞춤
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        expired = []
+
+        async def on_expire(channel_id, idle):
+            expired.append(channel_id)
+
+        scheduler = ExpiryScheduler(on_expire, default_idle=60.0, clock=loop.time)
+        scheduler.schedule(1, loop.time())
+        scheduler.start()
+        await asyncio.sleep(0)
+        scheduler.schedule(2, loop.time() - 60.0 + 0.02)  # 앞선 마감 → 대기 중인 태스크를 깨움
+        await asyncio.sleep(0.1)
+        await scheduler.close()
+        return expired
+
+    assert asyncio.run(scenario()) == [2]
@@ -0,0 +1,47 @@
+from fast_path import FastPath
+
+
+def test_trivial_input_is_classified(clock):
+    fast_path = FastPath(min_chars=2, clock=clock)
+    assert fast_path.classify("ㅋㅋㅋ") == "no_text"
+    assert fast_path.classify("👍👍") == "no_text"
+    assert fast_path.classify("?") == "no_text"
+    assert fast_path.classify("a") == "too_short"
+    assert fast_path.classify("환불 규정이 뭐야?") is None
+
+
+def test_duplicate_only_after_an_answer(clock):
+    fast_path = FastPath(duplicate_window=30.0, clock=clock)
+    assert fast_path.classify("매칭 언제 돼?", user_id=1) is None
+    # 🔸 답을 받기 전 재시도(시간 초과 / 오류 / 한도 초과 후)는 다시 처리
+    assert fast_path.classify("매칭 언제 돼?", user_id=1) is None
+
+    fast_path.answered("매칭 언제 돼?", user_id=1)
+    assert fast_path.classify("매칭  언제 돼?", user_id=1) == "duplicate"
+    assert fast_path.classify("매칭 언제 돼?", user_id=2) is None
+    clock.advance(31)
+    assert fast_path.classify("매칭 언제 돼?", user_id=1) is None
+
+
+def test_only_remembered_misses_are_short_circuited(clock):
+    fast_path = FastPath(miss_ttl=600.0, clock=clock)
+    assert not fast_path.known_miss("너는 누가 만들었어?")
+
+    fast_path.remember_miss("너는 누가 만들었어?")
+    assert fast_path.known_miss("너는  누가 만들었어?")
+    clock.advance(601)
+    assert not fast_path.known_miss("너는 누가 만들었어?")
+
+
+def test_snapshot_reports_filtered_ratio(clock):
+    fast_path = FastPath(clock=clock)
+    fast_path.classify("ㅎㅎ")
+    fast_path.classify("운영시간 알려줘")
+    fast_path.classify("누가 만들었어?")
+    fast_path.classify("환불 돼?")
+    fast_path.remember_miss("누가 만들었어?")
+    fast_path.known_miss("누가 만들었어?")
+    snapshot = fast_path.snapshot()
+    assert snapshot["filtered"] == 2
+    assert snapshot["passed"] == 2
+    assert snapshot["filtered_ratio"] == 0.5
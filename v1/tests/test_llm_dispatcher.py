@@ -0,0 +1,212 @@
+import asyncio, threading, time
+
+import pytest
+
+from llm_dispatcher import FakeModel, FakeResponse, LLMDispatcher, NoAnswer
+
+
+class CountingModel:
+    """동시에 몇 개의 호출이 워커 스레드에서 돌고 있는지 기록하는 가짜 모델."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.running = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.latency)
+        with self._lock:
+            self.running -= 1
+        return FakeResponse(f"answer: {prompt}")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_identical_prompts_share_one_upstream_call():
+    async def scenario():
+        model = FakeModel(latency=0.05)
+        dispatcher = LLMDispatcher(model, max_concurrency=4)
+        results = await asyncio.gather(*(dispatcher.generate("매칭 언제?") for _ in range(5)))
+        dispatcher.close()
+        return model, dispatcher, results
+
+    model, dispatcher, results = run(scenario())
+    assert model.calls == 1
+    assert len(set(results)) == 1
+    assert dispatcher.stats["coalesced"] == 4
+    assert dispatcher.inflight == 0
+
+
+def test_concurrency_is_capped():
+    async def scenario():
+        model = CountingModel(latency=0.03)
+        dispatcher = LLMDispatcher(model, max_concurrency=2)
+        results = await asyncio.gather(*(dispatcher.generate(f"질문 {i}") for i in range(6)))
+        dispatcher.close()
+        return model, results
+
+    model, results = run(scenario())
+    assert model.calls == 6
+    assert model.peak == 2
+    assert results == [f"answer: 질문 {i}" for i in range(6)]
+
+
+def test_event_loop_stays_responsive_during_calls():
+    async def scenario():
+        dispatcher = LLMDispatcher(FakeModel(latency=0.2), max_concurrency=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await dispatcher.generate("느린 질문")
+        task.cancel()
+        dispatcher.close()
+        return ticks
+
+    assert run(scenario()) >= 10
+
+
+def test_timeout_raises_and_is_counted():
+    async def scenario():
+        dispatcher = LLMDispatcher(FakeModel(latency=0.5), max_concurrency=1, timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await dispatcher.generate("느린 질문")
+        dispatcher.close()
+        return dispatcher
+
+    assert run(scenario()).stats["timeouts"] == 1
+
+
+def test_timed_out_call_keeps_its_slot_until_the_thread_finishes():
+    async def scenario():
+        model = CountingModel(latency=0.2)
+        dispatcher = LLMDispatcher(model, max_concurrency=1, timeout=0.02)
+        with pytest.raises(asyncio.TimeoutError):
+            await dispatcher.generate("느린 질문")
+        # 🔸 앞 호출의 스레드가 끝날 때까지는 자리를 기다리고, 제한 시간은 실제로 호출이 시작된 뒤부터 셈
+        start = time.perf_counter()
+        answer = await dispatcher.generate("다음 질문", timeout=0.3)
+        waited = time.perf_counter() - start
+        dispatcher.close()
+        return model, dispatcher, answer, waited
+
+    model, dispatcher, answer, waited = run(scenario())
+    assert answer == "answer: 다음 질문"
+    assert model.peak == 1
+    assert waited >= 0.3
+    assert dispatcher.stats["timeouts"] == 1
+
+
+def test_upstream_error_reaches_every_waiter():
+    async def scenario():
+        dispatcher = LLMDispatcher(FakeModel(latency=0.02, fail_rate=1.0), max_concurrency=1)
+        results = await asyncio.gather(*(dispatcher.generate("질문") for _ in range(3)), return_exceptions=True)
+        dispatcher.close()
+        return dispatcher, results
+
+    dispatcher, results = run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert dispatcher.stats["errors"] == 1
+
+
+def test_cancelling_one_waiter_keeps_shared_call_alive():
+    async def scenario():
+        dispatcher = LLMDispatcher(FakeModel(latency=0.05), max_concurrency=1)
+        first = asyncio.create_task(dispatcher.generate("질문"))
+        second = asyncio.create_task(dispatcher.generate("질문"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        answer = await second
+        dispatcher.close()
+        return dispatcher, first, answer
+
+    dispatcher, first, answer = run(scenario())
+    assert first.cancelled()
+    assert answer.startswith("[fake]")
+    assert dispatcher.stats["cancelled"] == 0
+
+
+def test_cancelling_last_waiter_cancels_upstream_wait():
+    async def scenario():
+        dispatcher = LLMDispatcher(FakeModel(latency=0.1), max_concurrency=1)
+        task = asyncio.create_task(dispatcher.generate("질문"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        dispatcher.close()
+        return dispatcher
+
+    dispatcher = run(scenario())
+    assert dispatcher.stats["cancelled"] == 1
+    assert dispatcher.inflight == 0
+
+
+def test_stream_yields_chunks_in_order():
+    async def scenario():
+        dispatcher = LLMDispatcher(FakeModel(latency=0.0, chunk_delay=0.0, answer="하나 둘 셋"), max_concurrency=1)
+        chunks = [chunk async for chunk in dispatcher.stream("질문")]
+        dispatcher.close()
+        return dispatcher, chunks
+
+    dispatcher, chunks = run(scenario())
+    assert chunks == ["하나 ", "둘 ", "셋"]
+    assert dispatcher.stats["streams"] == 1
+
+
+def test_stream_times_out():
+    async def scenario():
+        dispatcher = LLMDispatcher(FakeModel(latency=0.5), max_concurrency=1, timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            async for _ in dispatcher.stream("질문"):
+                pass
+        dispatcher.close()
+        return dispatcher
+
+    assert run(scenario()).stats["timeouts"] == 1
+
+
+def test_empty_or_blocked_response_raises_no_answer():
+    class BlockedResponse:
+        @property
+        def text(self):
+            raise ValueError("response was blocked")
+
+    class BlockedModel:
+        def generate_content(self, prompt, stream=False):
+            return iter([BlockedResponse()]) if stream else BlockedResponse()
+
+    async def scenario():
+        empty = LLMDispatcher(FakeModel(latency=0.0, answer="  "), max_concurrency=1)
+        blocked = LLMDispatcher(BlockedModel(), max_concurrency=1)
+        with pytest.raises(NoAnswer):
+            await empty.generate("질문")
+        with pytest.raises(NoAnswer):
+            await blocked.generate("질문")
+        with pytest.raises(NoAnswer):
+            async for _ in blocked.stream("질문"):
+                pass
+        with pytest.raises(NoAnswer):
+            async for _ in empty.stream("질문"):
+                pass
+        empty.close()
+        blocked.close()
+        return empty, blocked
+
+    empty, blocked = run(scenario())
+    assert empty.stats["no_answer"] == 2 and empty.stats["errors"] == 0
+    assert blocked.stats["no_answer"] == 2 and blocked.stats["errors"] == 0
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from outbound import MESSAGE_LIMIT, PRIORITY_REPLY, PRIORITY_WELCOME, FakeChannel, OutboundScheduler, TokenBucket
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def contents(channel: FakeChannel) -> list:
+    return [kwargs.get("content") for _, kwargs in channel.sent]
+
+
+def test_token_bucket_refills_with_clock(clock):
+    bucket = TokenBucket(rate=0.5, capacity=2, clock=clock)
+    assert bucket.take() and bucket.take()
+    assert not bucket.take()
+    assert bucket.delay() == pytest.approx(2.0)
+    clock.advance(1.0)
+    assert bucket.delay() == pytest.approx(1.0)
+    clock.advance(1.0)
+    assert bucket.take()
+    clock.advance(100.0)
+    bucket.take(), bucket.take()
+    assert not bucket.take()  # 용량 이상으로 쌓이지 않음
+
+
+def test_reply_jumps_ahead_of_queued_welcomes():
+    async def scenario():
+        outbound = OutboundScheduler(route_rate=50, route_burst=1)
+        channel = FakeChannel(1, latency=0.0, limit=100)
+        futures = [outbound.send(channel, embed=f"환영 {i}", priority=PRIORITY_WELCOME) for i in range(3)]
+        futures.append(outbound.send(channel, "답변", priority=PRIORITY_REPLY))
+        await asyncio.gather(*futures)
+        await outbound.close()
+        return channel
+
+    channel = run(scenario())
+    assert [kwargs.get("content") or kwargs.get("embed") for _, kwargs in channel.sent] == ["답변", "환영 0", "환영 1", "환영 2"]
+
+
+def test_queued_texts_to_one_channel_are_coalesced():
+    async def scenario():
+        outbound = OutboundScheduler(route_rate=50, route_burst=1)
+        channel = FakeChannel(1, latency=0.0, limit=100)
+        first = outbound.send(channel, "첫 번째")
+        rest = [outbound.send(channel, f"답변 {i}") for i in range(3)]
+        results = await asyncio.gather(first, *rest)
+        await outbound.close()
+        return outbound, channel, results
+
+    outbound, channel, results = run(scenario())
+    assert contents(channel) == ["첫 번째\n답변 0\n답변 1\n답변 2"]
+    assert outbound.stats["coalesced"] == 3
+    assert len({id(result) for result in results}) == 1  # 합쳐진 요청은 같은 메시지를 받음
+
+
+def test_coalescing_respects_message_limit():
+    async def scenario():
+        outbound = OutboundScheduler(route_rate=50, route_burst=1)
+        channel = FakeChannel(1, latency=0.0, limit=100)
+        long_text = "가" * (MESSAGE_LIMIT - 10)
+        await asyncio.gather(outbound.send(channel, long_text), outbound.send(channel, "짧은 답변 하나 더"))
+        await outbound.close()
+        return channel
+
+    channel = run(scenario())
+    assert len(channel.sent) == 2
+    assert all(len(text) <= MESSAGE_LIMIT for text in contents(channel))
+
+
+def test_embeds_and_edited_messages_are_not_coalesced():
+    async def scenario():
+        outbound = OutboundScheduler(route_rate=50, route_burst=1)
+        channel = FakeChannel(1, latency=0.0, limit=100)
+        await asyncio.gather(
+            outbound.send(channel, "답변"),
+            outbound.send(channel, embed="도움말"),
+            outbound.send(channel, "자리표시", coalesce=False),
+            outbound.send(channel, "다른 답변"),
+        )
+        await outbound.close()
+        return outbound, channel
+
+    outbound, channel = run(scenario())
+    assert len(channel.sent) == 4
+    assert contents(channel)[2] == "자리표시"
+    assert outbound.stats["coalesced"] == 0
+
+
+def test_route_rate_limit_avoids_429():
+    # 🔸 FakeChannel은 0.2초에 3번을 넘기면 429를 던짐. 스케줄러 설정(초당 10번, 버스트 2)은 그 안에 들어옴
+    async def scenario():
+        outbound = OutboundScheduler(route_rate=10, route_burst=2)
+        channel = FakeChannel(1, latency=0.0, limit=3, per=0.2)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(outbound.send(channel, embed=str(i)) for i in range(6)))
+        elapsed = loop.time() - start
+        await outbound.close()
+        return outbound, channel, elapsed
+
+    outbound, channel, elapsed = run(scenario())
+    assert len(channel.sent) == 6
+    assert outbound.stats["failed"] == 0
+    assert elapsed >= 0.35  # 버스트 2개 이후 0.1초 간격
+
+
+def test_channels_drain_independently():
+    async def scenario():
+        outbound = OutboundScheduler(route_rate=1, route_burst=1)
+        slow, fast = FakeChannel(1, latency=0.0, limit=100), FakeChannel(2, latency=0.0, limit=100)
+        outbound.send(slow, embed="a")
+        waiting = outbound.send(slow, embed="b")  # 토큰이 1초 뒤에야 생김
+        await asyncio.wait_for(outbound.send(fast, embed="c"), 0.2)
+        waiting.cancel()
+        await outbound.close()
+        return slow, fast
+
+    slow, fast = run(scenario())
+    assert len(slow.sent) == 1
+    assert len(fast.sent) == 1
+
+
+def test_send_failure_reaches_every_coalesced_caller():
+    class BrokenChannel(FakeChannel):
+        async def send(self, **kwargs):
+            raise RuntimeError("403 Forbidden")
+
+    async def scenario():
+        outbound = OutboundScheduler(route_rate=50, route_burst=1)
+        channel = BrokenChannel(1)
+        results = await asyncio.gather(outbound.send(channel, "a"), outbound.send(channel, "b"), return_exceptions=True)
+        await outbound.close()
+        return outbound, results
+
+    outbound, results = run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert outbound.stats["failed"] == 1
@@ -0,0 +1,128 @@
+import asyncio
+
+from outbound import FakeChannel, OutboundScheduler
+from streaming import PLACEHOLDER, StreamMetrics, split_point, stream_reply
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def chunks(parts, delay: float = 0.0, error: Exception | None = None):
+    for part in parts:
+        if delay:
+            await asyncio.sleep(delay)
+        yield part
+    if error is not None:
+        raise error
+
+
+def test_split_point_prefers_newline_then_space():
+    assert split_point("짧은 글", limit=10) == len("짧은 글")
+    assert split_point("가나다라마바\n사아자차카타", limit=10) == 7
+    assert split_point("가나다라마바 사아자차카타", limit=10) == 7
+    assert split_point("가나다라마\n바 사아자차카", limit=10) == 6  # 뒤쪽 띄어쓰기보다 줄바꿈 우선
+    assert split_point("가" * 25, limit=10) == 10
+
+
+def recorder(channel: FakeChannel, sent: list):
+    async def send(content):
+        message = await channel.send(content=content)
+        sent.append(message)
+        return message
+    return send
+
+
+def test_placeholder_is_edited_into_final_text():
+    async def scenario():
+        sent = []
+        metrics = StreamMetrics()
+        text, error = await stream_reply(recorder(FakeChannel(1, latency=0.0, limit=100), sent),
+                                         chunks(["안녕", "하세요"]), edit_interval=0.0, metrics=metrics)
+        return sent, metrics, text, error
+
+    sent, metrics, text, error = run(scenario())
+    assert error is None
+    assert text == "안녕하세요"
+    assert len(sent) == 1
+    assert sent[0].edits[0][1] != PLACEHOLDER and sent[0].content == "안녕하세요"
+    assert metrics.stats["streams"] == 1
+    assert len(metrics.ttfb) == 1 and len(metrics.placeholder) == 1
+
+
+def test_edits_are_throttled():
+    async def scenario():
+        sent = []
+        send = recorder(FakeChannel(1, latency=0.0, limit=100), sent)
+        metrics = StreamMetrics()
+        await stream_reply(send, chunks([f"{i} " for i in range(20)], delay=0.005), edit_interval=10.0, metrics=metrics)
+        return sent[0], metrics
+
+    message, metrics = run(scenario())
+    # 🔸 첫 조각에서 한 번, 마지막 flush에서 한 번
+    assert len(message.edits) == 2
+    assert message.content.startswith("0 1 2") and message.content.endswith("19 ")
+
+
+def test_long_reply_continues_in_follow_up_messages():
+    async def scenario():
+        sent = []
+        send = recorder(FakeChannel(1, latency=0.0, limit=100), sent)
+        metrics = StreamMetrics()
+        text, _ = await stream_reply(send, chunks(["가" * 8, " ", "나" * 8]), edit_interval=0.0, metrics=metrics, limit=10)
+        return sent, metrics, text
+
+    sent, metrics, text = run(scenario())
+    assert [message.content for message in sent] == ["가" * 8 + " ", "나" * 8]
+    assert "".join(message.content for message in sent) == text
+    assert metrics.stats["followups"] == 1
+
+
+def test_error_is_appended_and_returned():
+    async def scenario():
+        sent = []
+        send = recorder(FakeChannel(1, latency=0.0, limit=100), sent)
+        metrics = StreamMetrics()
+        text, error = await stream_reply(send, chunks(["부분 답변"], error=RuntimeError("끊김")), edit_interval=0.0,
+                                         metrics=metrics, format_error=lambda e: f"❌ {e}")
+        return sent[0], metrics, text, error
+
+    message, metrics, text, error = run(scenario())
+    assert isinstance(error, RuntimeError)
+    assert text == "부분 답변\n❌ 끊김"
+    assert message.content == text
+    assert metrics.stats["errors"] == 1
+
+
+def test_streamed_placeholder_is_not_merged_with_other_replies():
+    # 🔸 같은 채널에 대기 중인 다른 답변과 합쳐지면 이후 수정이 그 답변을 지워버림
+    async def scenario():
+        outbound = OutboundScheduler(route_rate=5, route_burst=1)
+        channel = FakeChannel(1, latency=0.0, limit=100)
+        outbound.send(channel, "먼저 보낸 답변")
+        faq = outbound.send(channel, "FAQ 답변")
+        text, _ = await stream_reply(
+            lambda content: outbound.send(channel, content, coalesce=False),
+            chunks(["스트리밍 ", "답변"], delay=0.01),
+            edit_interval=0.0,
+        )
+        await faq
+        await outbound.close()
+        return channel, text
+
+    channel, text = run(scenario())
+    sent = [kwargs["content"] for _, kwargs in channel.sent]
+    assert sent == ["먼저 보낸 답변\nFAQ 답변", PLACEHOLDER]
+
+
+def test_empty_stream_replaces_placeholder():
+    async def scenario():
+        sent = []
+        text, error = await stream_reply(recorder(FakeChannel(1, latency=0.0, limit=100), sent), chunks([]),
+                                         edit_interval=0.0, empty_text="답을 찾지 못했어요")
+        return sent, text, error
+
+    sent, text, error = run(scenario())
+    assert text == "" and error is None
+    assert len(sent) == 1
+    assert sent[0].content == "답을 찾지 못했어요"
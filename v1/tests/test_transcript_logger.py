@@ -0,0 +1,47 @@
+import asyncio
+
+from transcript_archive import TranscriptArchive
+from transcript_logger import TranscriptLogger
+
+
+class BrokenArchive:
+    def append_many(self, rows):
+        raise RuntimeError("database is locked")
+
+
+def write(logger: TranscriptLogger, entries):
+    async def scenario():
+        logger.start()
+        for channel, author, content in entries:
+            logger.log(channel, author, content)
+        await logger.close()
+    asyncio.run(scenario())
+
+
+def test_archive_failure_keeps_text_files(tmp_path):
+    logger = TranscriptLogger(str(tmp_path), flush_interval=0.01, archive=BrokenArchive())
+    write(logger, [("문의-a", "user", "환불 돼요?"), ("문의-a", "마롱", "확인해 볼게요")])
+    lines = (tmp_path / "문의-a.txt").read_text(encoding="utf-8").splitlines()
+    assert [line.split("] ", 1)[1] for line in lines] == ["user: 환불 돼요?", "마롱: 확인해 볼게요"]
+    assert logger.stats["archive_failures"] == 1
+    assert logger.stats["written"] == 2
+
+
+def test_file_failure_keeps_archive_rows(tmp_path):
+    archive = TranscriptArchive(str(tmp_path / "transcripts.sqlite3"))
+    logger = TranscriptLogger(str(tmp_path / "logs"), flush_interval=0.01, archive=archive)
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "logs" / "문의-a.txt").mkdir()  # 🔸 같은 이름의 폴더가 있어서 파일을 열 수 없음
+    write(logger, [("문의-a", "user", "환불 돼요?")])
+    assert logger.stats["file_failures"] == 1
+    assert [row["content"] for row in archive.query(channel="문의-a")] == ["환불 돼요?"]
+    archive.close()
+
+
+def test_time_rotation_uses_first_line_not_mtime(tmp_path):
+    (tmp_path / "문의-a.txt").write_text("[2020-01-01 00:00:00] user: 예전 기록\n", encoding="utf-8")
+    logger = TranscriptLogger(str(tmp_path), flush_interval=0.01, rotate_interval=3600, compress=False)
+    write(logger, [("문의-a", "user", "새 기록")])
+    rotated = [path.name for path in tmp_path.iterdir() if path.name != "문의-a.txt"]
+    assert len(rotated) == 1 and rotated[0].startswith("문의-a.")
+    assert logger.stats["rotations"] == 1
@@ -0,0 +1,263 @@
+import argparse, glob, gzip, os, re, sqlite3, time
+from calendar import timegm
+from collections import Counter
+from datetime import datetime
+
+# 🔹 TranscriptLogger 텍스트 기록 형식: [YYYY-mm-dd HH:MM:SS] 이름: 내용
+LINE_RE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (.*?): (.*)$")
+# 🔸 회전된 파일 이름: 문의-이름.20250101-120000(-1).txt(.gz)
+ROTATED_RE = re.compile(r"\.\d{8}-\d{6}(?:-\d+)?$")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_time(text: str) -> float:
+    # 🔸 기록은 UTC 기준
+    return float(timegm(time.strptime(text, TIME_FORMAT)))
+
+
+def format_time(ts: float) -> str:
+    return datetime.utcfromtimestamp(ts).strftime(TIME_FORMAT)
+
+
+def channel_from_path(path: str) -> str:
+    name = os.path.basename(path)
+    for suffix in (".gz", ".txt"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return ROTATED_RE.sub("", name)
+
+
+def parse_log(lines) -> list[tuple[float, str, str]]:
+    # 🔹 (시각, 이름, 내용). 형식에 안 맞는 줄은 여러 줄 메시지의 이어지는 부분으로 봄
+    entries: list[list] = []
+    for raw in lines:
+        line = raw.rstrip("\n")
+        match = LINE_RE.match(line)
+        if match:
+            entries.append([parse_time(match.group(1)), match.group(2), match.group(3)])
+        elif entries:
+            entries[-1][2] += "\n" + line
+    return [tuple(entry) for entry in entries]
+
+
+class TranscriptArchive:
+    """문의 대화 기록 SQLite 보관소. 채널 / 사용자 / 시간 인덱스 + FTS5 본문 검색. 추가만 함."""
+
+    def __init__(self, db_path: str = "./data/transcripts.sqlite3"):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 🔸 TranscriptLogger는 to_thread 워커에서 한 번에 한 배치씩만 씀
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY,
+                ts REAL NOT NULL,
+                channel TEXT NOT NULL,
+                channel_id INTEGER,
+                author TEXT NOT NULL,
+                user_id INTEGER,
+                content TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_channel_ts ON messages (channel, ts);
+            CREATE INDEX IF NOT EXISTS idx_messages_author_ts ON messages (author, ts);
+            CREATE INDEX IF NOT EXISTS idx_messages_user_ts ON messages (user_id, ts);
+            CREATE INDEX IF NOT EXISTS idx_messages_ts ON messages (ts);
+            CREATE TABLE IF NOT EXISTS imported_files (
+                path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, rows INTEGER NOT NULL
+            );
+            """
+        )
+        self.fts = self._create_fts()
+        self._db.commit()
+
+    def _create_fts(self) -> bool:
+        # 🔹 trigram 토크나이저: 띄어쓰기 없는 한국어도 부분 문자열로 검색 (SQLite 3.34+)
+        try:
+            self._db.executescript(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts
+                    USING fts5(content, content='messages', content_rowid='id', tokenize='trigram');
+                CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+                    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+                    INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                END;
+                """
+            )
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"[WARN] FTS5 trigram을 쓸 수 없어 LIKE 검색으로 대체: {e}")
+            return False
+
+    def append_many(self, rows: list[tuple]):
+        """rows: (ts, channel, channel_id, author, user_id, content)"""
+        self._db.executemany(
+            "INSERT INTO messages (ts, channel, channel_id, author, user_id, content) VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        self._db.commit()
+
+    def query(
+        self,
+        text: str | None = None,
+        channel: str | None = None,
+        author: str | None = None,
+        user_id: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """조건에 맞는 메시지를 최신순으로. since / until은 UNIX 초 (until은 미포함)."""
+        where, params = [], []
+        for column, value in (("m.channel = ?", channel), ("m.author = ?", author), ("m.user_id = ?", user_id),
+                              ("m.ts >= ?", since), ("m.ts < ?", until)):
+            if value is not None:
+                where.append(column)
+                params.append(value)
+
+        join = ""
+        if text:
+            # 🔸 trigram은 3글자 이상만 색인되므로 짧은 단어는 LIKE로 확인
+            long_terms = [term for term in text.split() if len(term) >= 3] if self.fts else []
+            short_terms = [term for term in text.split() if term not in long_terms]
+            if long_terms:
+                join = "JOIN messages_fts f ON f.rowid = m.id"
+                where.append("messages_fts MATCH ?")
+                params.append(" AND ".join('"' + term.replace('"', '""') + '"' for term in long_terms))
+            for term in short_terms:
+                where.append("m.content LIKE ? ESCAPE '\\'")
+                params.append("%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+
+        sql = f"SELECT m.ts, m.channel, m.channel_id, m.author, m.user_id, m.content FROM messages m {join}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY m.ts DESC, m.id DESC LIMIT ?"
+        params.append(limit)
+        columns = ("ts", "channel", "channel_id", "author", "user_id", "content")
+        return [dict(zip(columns, row)) for row in self._db.execute(sql, params)]
+
+    def count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def import_logs(self, logs_dir: str = "./logs") -> dict:
+        """기존 텍스트 기록(.txt / 회전된 .txt.gz)을 한 번만 가져옴. 이미 가져온 파일은 건너뜀."""
+        stats = {"files": 0, "skipped": 0, "rows": 0}
+        paths = sorted(glob.glob(os.path.join(logs_dir, "*.txt")) + glob.glob(os.path.join(logs_dir, "*.txt.gz")))
+        for path in paths:
+            size, mtime = os.path.getsize(path), os.path.getmtime(path)
+            key = os.path.abspath(path)
+            seen = self._db.execute("SELECT size, mtime, rows FROM imported_files WHERE path = ?", (key,)).fetchone()
+            if seen is not None and seen[:2] == (size, mtime):
+                stats["skipped"] += 1
+                continue
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+                entries = parse_log(f)
+            channel = channel_from_path(path)
+            # 🔸 이어 쓰인 파일 / 실시간으로 이미 보관된 메시지는 건너뜀 (텍스트 기록은 초 단위)
+            rows = [(ts, channel, None, author, None, content) for ts, author, content in entries
+                    if not self._exists(channel, ts, author, content)]
+            with self._db:
+                self._db.executemany(
+                    "INSERT INTO messages (ts, channel, channel_id, author, user_id, content) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO imported_files VALUES (?, ?, ?, ?)",
+                    (key, size, mtime, len(rows) + (seen[2] if seen else 0)),
+                )
+            stats["files"] += 1
+            stats["rows"] += len(rows)
+        return stats
+
+    def _exists(self, channel: str, ts: float, author: str, content: str) -> bool:
+        row = self._db.execute(
+            "SELECT 1 FROM messages WHERE channel = ? AND ts >= ? AND ts < ? AND author = ? AND content = ? LIMIT 1",
+            (channel, ts, ts + 1, author, content),
+        ).fetchone()
+        return row is not None
+
+    def frequent_unanswered(self, faq: dict, since: float | None = None, top: int = 20, min_count: int = 2):
+        """현재 FAQ로 답할 수 없는 질문을 자주 나온 순으로. FAQ에 추가할 후보 찾기용."""
+        from faq_matcher import FAQMatcher
+        from semantic_retriever import SemanticRetriever
+        from match_pool import local_match
+
+        matcher, retriever = FAQMatcher(faq), SemanticRetriever(faq)
+        sql = "SELECT content FROM messages" + (" WHERE ts >= ?" if since is not None else "")
+        counts: Counter = Counter()
+        for (content,) in self._db.execute(sql, (since,) if since is not None else ()):
+            question = " ".join(content.lower().split())
+            if len(question) < 2 or question.startswith("!"):
+                continue
+            counts[question] += 1
+        unanswered = [
+            (question, n) for question, n in counts.most_common()
+            if n >= min_count and local_match(faq, matcher, retriever, question) is None
+        ]
+        return unanswered[:top]
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def _parse_when(text: str | None) -> float | None:
+    # 🔸 "2025-01-31" 또는 "2025-01-31 12:00:00" (UTC)
+    if not text:
+        return None
+    return parse_time(text if " " in text else f"{text} 00:00:00")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="문의 대화 기록 보관소")
+    parser.add_argument("--db", default=os.getenv("TRANSCRIPT_ARCHIVE_PATH", "./data/transcripts.sqlite3"))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imp = commands.add_parser("import", help="logs/*.txt(.gz) 가져오기")
+    imp.add_argument("logs_dir", nargs="?", default="./logs")
+
+    search = commands.add_parser("search", help="채널 / 사용자 / 기간 / 키워드로 검색")
+    search.add_argument("text", nargs="?")
+    search.add_argument("--channel")
+    search.add_argument("--author")
+    search.add_argument("--user-id", type=int)
+    search.add_argument("--since")
+    search.add_argument("--until")
+    search.add_argument("--limit", type=int, default=50)
+
+    mine = commands.add_parser("mine", help="FAQ로 답할 수 없는 자주 나온 질문")
+    mine.add_argument("--since")
+    mine.add_argument("--top", type=int, default=20)
+    mine.add_argument("--min-count", type=int, default=2)
+
+    args = parser.parse_args(argv)
+    archive = TranscriptArchive(args.db)
+    try:
+        if args.command == "import":
+            start = time.perf_counter()
+            stats = archive.import_logs(args.logs_dir)
+            print(f"imported files={stats['files']} rows={stats['rows']} skipped={stats['skipped']} "
+                  f"total={archive.count()} ({time.perf_counter() - start:.2f}s)")
+        elif args.command == "search":
+            start = time.perf_counter()
+            rows = archive.query(args.text, channel=args.channel, author=args.author, user_id=args.user_id,
+                                 since=_parse_when(args.since), until=_parse_when(args.until), limit=args.limit)
+            for row in rows:
+                print(f"[{format_time(row['ts'])}] #{row['channel']} {row['author']}: {row['content']}")
+            print(f"{len(rows)} rows ({(time.perf_counter() - start) * 1e3:.1f} ms)")
+        elif args.command == "mine":
+            from content_store import ContentStore
+            faq = ContentStore(os.getenv("CONTENT_PATH", "./content.json")).load().faq
+            for question, n in archive.frequent_unanswered(faq, _parse_when(args.since), args.top, args.min_count):
+                print(f"{n:5d}  {question}")
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import asyncio, gzip, os, shutil, time
+from calendar import timegm
+from collections import OrderedDict
+from datetime import datetime
+
+DURABILITY_MODES = ("buffered", "flush", "fsync")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def file_started_at(path: str) -> float:
+    # 🔹 파일 시작 시각 = 첫 줄의 기록 시각 (UTC). mtime은 마지막 기록 시각이라 회전 기준으로 쓸 수 없음
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            first = f.readline()
+    except FileNotFoundError:
+        return time.time()
+    try:
+        return float(timegm(time.strptime(first[1:20], TIME_FORMAT)))
+    except ValueError:
+        return os.path.getmtime(path) if first else time.time()
+
+
+class TranscriptLogger:
+    """문의 채널 대화 기록을 큐에 모아서 백그라운드에서 배치로 기록."""
+
+    def __init__(
+        self,
+        logs_dir: str = "./logs",
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        max_open_files: int = 32,
+        max_bytes: int = 5 * 1024 * 1024,
+        rotate_interval: float | None = None,
+        compress: bool = True,
+        durability: str = "flush",
+        max_queue: int = 10000,
+        archive=None,
+        text_files: bool = True,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability는 {DURABILITY_MODES} 중 하나여야 합니다: {durability}")
+        self.logs_dir = logs_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_open_files = max_open_files
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self.durability = durability
+        # 🔹 archive(TranscriptArchive)가 있으면 같은 배치를 SQLite에도 추가 (검색용)
+        self.archive = archive
+        self.text_files = text_files or archive is None
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+        # 🔹 채널 이름 -> (파일 핸들, 파일 시작 시각), 오래 안 쓴 핸들부터 닫음
+        self._handles: OrderedDict[str, tuple] = OrderedDict()
+        self.stats = {"written": 0, "batches": 0, "dropped": 0, "rotations": 0, "file_failures": 0, "archive_failures": 0}
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            os.makedirs(self.logs_dir, exist_ok=True)
+            self._task = asyncio.create_task(self._run())
+
+    def log(self, channel_name: str, author: str, content: str, channel_id: int | None = None, user_id: int | None = None):
+        now = time.time()
+        timestamp = datetime.utcfromtimestamp(now).strftime(TIME_FORMAT)
+        line = f"[{timestamp}] {author}: {content}\n"
+        try:
+            self._queue.put_nowait((channel_name, line, (now, channel_name, channel_id, author, user_id, content)))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            print(f"[WARN] 문의 기록 큐가 가득 차서 버려짐: {channel_name}")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # 🔸 배치 크기나 플러시 간격 중 먼저 도달하는 쪽에서 기록
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[str, str, tuple]]):
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+        except Exception as e:
+            print(f"[ERROR] 문의 기록 실패: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_batch(self, batch: list[tuple[str, str, tuple]]):
+        # 🔹 텍스트 파일 / 보관소는 따로 처리해서 한쪽이 실패해도 다른 쪽에는 남김
+        if self.text_files:
+            try:
+                self._write_files(batch)
+            except Exception as e:
+                self.stats["file_failures"] += 1
+                print(f"[ERROR] 문의 기록 파일 쓰기 실패 ({len(batch)}건): {e}")
+        if self.archive is not None:
+            try:
+                self.archive.append_many([row for _, _, row in batch])
+            except Exception as e:
+                self.stats["archive_failures"] += 1
+                print(f"[ERROR] 문의 기록 보관소 추가 실패 ({len(batch)}건): {e}")
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+
+    def _write_files(self, batch: list[tuple[str, str, tuple]]):
+        grouped: dict[str, list[str]] = {}
+        for channel_name, line, _ in batch:
+            grouped.setdefault(channel_name, []).append(line)
+
+        for channel_name, lines in grouped.items():
+            handle = self._handle(channel_name)
+            handle.writelines(lines)
+            if self.durability != "buffered":
+                handle.flush()
+            if self.durability == "fsync":
+                os.fsync(handle.fileno())
+            self._maybe_rotate(channel_name)
+
+    def _handle(self, channel_name: str):
+        entry = self._handles.get(channel_name)
+        if entry is not None:
+            self._handles.move_to_end(channel_name)
+            return entry[0]
+
+        path = os.path.join(self.logs_dir, f"{channel_name}.txt")
+        started_at = file_started_at(path)
+        handle = open(path, "a", encoding="utf-8")
+        self._handles[channel_name] = (handle, started_at)
+        while len(self._handles) > self.max_open_files:
+            _, (old, _) = self._handles.popitem(last=False)
+            old.close()
+        return handle
+
+    def _maybe_rotate(self, channel_name: str):
+        handle, started_at = self._handles[channel_name]
+        too_big = self.max_bytes and handle.tell() >= self.max_bytes
+        too_old = self.rotate_interval and time.time() - started_at >= self.rotate_interval
+        if not (too_big or too_old):
+            return
+
+        handle.close()
+        del self._handles[channel_name]
+        path = os.path.join(self.logs_dir, f"{channel_name}.txt")
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        rotated = os.path.join(self.logs_dir, f"{channel_name}.{stamp}.txt")
+        seq = 1
+        while os.path.exists(rotated) or os.path.exists(f"{rotated}.gz"):
+            rotated = os.path.join(self.logs_dir, f"{channel_name}.{stamp}-{seq}.txt")
+            seq += 1
+        os.replace(path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        self.stats["rotations"] += 1
+
+    async def close(self):
+        # 🔹 남은 기록을 모두 쓰고 핸들을 닫음
+        if self._task is not None:
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._close_handles)
+
+    def _close_handles(self):
+        for handle, _ in self._handles.values():
+            handle.close()
+        self._handles.clear()